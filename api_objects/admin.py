@@ -1,10 +1,11 @@
 import json
-import logging
-from typing import Optional
+from contextlib import ExitStack, contextmanager
+from typing import Iterator, Optional
 
 import allure
 
-from api_objects.user import UserAPI
+from api_objects.uploads import MappedFile, MultipartStream, attach_file_once
+from api_objects.user import AsyncUserAPI, UserAPI
 from test_data.get_data_from_excel import GetData
 
 
@@ -13,7 +14,7 @@ class AdminAPI(UserAPI):
 
     def __init__(self) -> None:
         super().__init__()
-        self.base_url = "http://54.201.140.239/api/1.0/admin/product"
+        self.base_url = f"{self.host}/api/1.0/admin/product"
 
     def create_product(self, payload: dict, image_files):
         allure.attach(
@@ -21,9 +22,10 @@ class AdminAPI(UserAPI):
             "Payload",
             attachment_type=allure.attachment_type.TEXT,
         )
-        for file in image_files:
-            allure.attach(file[1].read(), file[0], attachment_type=allure.attachment_type.JPG)
-        return self.post(self.base_url, data=payload, files=image_files)
+        for _, file in image_files:
+            attach_file_once(file)
+        body = MultipartStream(payload, image_files)
+        return self.post(self.base_url, data=body, headers={"Content-Type": body.content_type})
 
     def generate_product_payload(self, product_info: dict) -> dict:
         return {
@@ -40,30 +42,23 @@ class AdminAPI(UserAPI):
             "sizes": product_info["Sizes"].split(","),
         }
 
-    def generate_product_image_files(self, product_info: dict) -> list:
+    @contextmanager
+    def generate_product_image_files(self, product_info: dict) -> Iterator[list]:
         test_data = GetData()
-        images = []
-        if product_info["Main Image"] != "":
-            self.main_image = open(test_data.get_file_full_path(product_info["Main Image"]), "rb")
-            images.append(("main_image", self.main_image))
-        if product_info["Other Image 1"] != "":
-            self.other_image_1 = open(test_data.get_file_full_path(product_info["Other Image 1"]), "rb")
-            images.append(("other_images", self.other_image_1))
-        if product_info["Other Image 2"] != "":
-            self.other_image_2 = open(test_data.get_file_full_path(product_info["Other Image 2"]), "rb")
-            images.append(("other_images", self.other_image_2))
-        return images
+        with ExitStack() as stack:
+            yield [
+                (field, stack.enter_context(MappedFile(test_data.get_file_full_path(product_info[column]))))
+                for field, column in (
+                    ("main_image", "Main Image"),
+                    ("other_images", "Other Image 1"),
+                    ("other_images", "Other Image 2"),
+                )
+                if product_info[column] != ""
+            ]
 
     def delete_product_by_id(self, product_id):
         return self.delete(self.base_url + f"/{product_id}")
 
-    def close_opened_images(self) -> None:
-        if hasattr(self, "main_image"):
-            logging.info('Closing "mainImage.jpg"')
-            self.main_image.close()
-        if hasattr(self, "other_image_1"):
-            logging.info('Closing "otherImage0.jpg"')
-            self.other_image_1.close()
-        if hasattr(self, "other_image_2"):
-            logging.info('Closing "otherImage1.jpg"')
-            self.other_image_2.close()
+
+class AsyncAdminAPI(AsyncUserAPI, AdminAPI):
+    pass
@@ -0,0 +1,131 @@
+import json
+import logging
+import queue
+import random
+import threading
+from typing import Literal
+
+import allure
+import allure_commons
+import requests
+from allure_commons import hookimpl
+from allure_commons.logger import AllureFileLogger
+
+from api_objects.config import ATTACH_MAX_KB, ATTACH_POLICY, ATTACH_SAMPLE_RATE
+
+AttachPolicy = Literal["always", "on_failure", "sampled", "truncated"]
+POLICIES = ("always", "on_failure", "sampled", "truncated")
+
+
+class ResponseAttacher:
+    """Decide whether and how HTTP responses end up in the Allure report.
+
+    Policies:
+        always: attach headers and full body of every response.
+        on_failure: hold responses back and attach them only if the test phase fails.
+        sampled: attach a random share of responses, see ``sample_rate``.
+        truncated: attach every response, cutting bodies larger than ``max_kb``.
+    """
+
+    def __init__(
+        self, policy: AttachPolicy = ATTACH_POLICY, sample_rate: float = ATTACH_SAMPLE_RATE, max_kb: int = ATTACH_MAX_KB
+    ) -> None:
+        if policy not in POLICIES:
+            raise ValueError(f"Attach policy must be one of {'/'.join(POLICIES)}, got '{policy}'")
+        self.policy = policy
+        self.sample_rate = sample_rate
+        self.max_bytes = max_kb * 1024
+        self._pending: list = []
+        self._lock = threading.Lock()
+
+    def attach(self, response: requests.Response) -> None:
+        if self.policy == "on_failure":
+            # Only keep a reference, nothing is formatted until the outcome is known.
+            with self._lock:
+                self._pending.append(response)
+        elif self.policy != "sampled" or random.random() < self.sample_rate:
+            self._attach_now(response)
+
+    def flush(self, failed: bool) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if failed:
+            for response in pending:
+                self._attach_now(response)
+
+    def _attach_now(self, response: requests.Response) -> None:
+        allure.attach(
+            json.dumps(dict(response.headers), indent=2),
+            "Response Headers",
+            attachment_type=allure.attachment_type.TEXT,
+        )
+        allure.attach(self._body_of(response), "Response Body", attachment_type=allure.attachment_type.TEXT)
+
+    def _body_of(self, response: requests.Response) -> str:
+        if self.policy != "truncated" or len(response.content) <= self.max_bytes:
+            return response.text
+        body = response.content[: self.max_bytes].decode(response.encoding or "utf-8", errors="ignore")
+        return body + f"\n... truncated {len(response.content) - self.max_bytes} bytes"
+
+
+class BackgroundFileLogger(AllureFileLogger):
+    """Allure file logger which writes attachment bodies and copies attached files from a background thread.
+
+    Results and containers are still written synchronously, they are small and Allure reads them
+    back at the end of each test.
+    """
+
+    def __init__(self, report_dir) -> None:
+        super().__init__(report_dir)
+        self._queue: queue.Queue = queue.Queue()
+        self._thread = threading.Thread(target=self._write_attachments, name="allure-writer", daemon=True)
+        self._thread.start()
+
+    @hookimpl
+    def report_attached_data(self, body, file_name):
+        self._queue.put((super().report_attached_data, body, file_name))
+
+    @hookimpl
+    def report_attached_file(self, source, file_name):
+        # Uploaded images can be tens of MB, copying them would hold up the test like a large body.
+        self._queue.put((super().report_attached_file, source, file_name))
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._thread.join()
+
+    def _write_attachments(self) -> None:
+        while (item := self._queue.get()) is not None:
+            write, source, file_name = item
+            try:
+                write(source, file_name)
+            except OSError as e:
+                logging.error(f"Failed to write Allure attachment {file_name}: {e}")
+
+
+def install_background_file_logger(config) -> None:
+    """Swap allure-pytest's file logger for a BackgroundFileLogger.
+
+    Must run after allure-pytest's own ``pytest_configure``. The original logger is put back on
+    cleanup, after pending attachments are written, so allure-pytest can unregister it as usual.
+    """
+    report_dir = config.option.allure_report_dir
+    plugins = allure_commons.plugin_manager.get_plugins()
+    if not report_dir or any(isinstance(plugin, BackgroundFileLogger) for plugin in plugins):
+        return
+    originals = [plugin for plugin in plugins if type(plugin) is AllureFileLogger]
+    for plugin in originals:
+        allure_commons.plugin_manager.unregister(plugin)
+    background_logger = BackgroundFileLogger(report_dir)
+    allure_commons.plugin_manager.register(background_logger)
+
+    def restore() -> None:
+        background_logger.close()
+        allure_commons.plugin_manager.unregister(background_logger)
+        for plugin in originals:
+            allure_commons.plugin_manager.register(plugin)
+
+    config.add_cleanup(restore)
+
+
+response_attacher = ResponseAttacher()
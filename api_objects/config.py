@@ -0,0 +1,17 @@
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "10"))
+HTTP_KEEP_ALIVE = os.getenv("HTTP_KEEP_ALIVE", "true").lower() == "true"
+STYLISH_API_HOST = os.getenv("STYLISH_API_HOST", "http://54.201.140.239")
+# One of "always", "on_failure", "sampled" or "truncated".
+ATTACH_POLICY = os.getenv("ATTACH_POLICY", "always")
+ATTACH_SAMPLE_RATE = float(os.getenv("ATTACH_SAMPLE_RATE", "0.1"))
+ATTACH_MAX_KB = int(os.getenv("ATTACH_MAX_KB", "64"))
+LATENCY_REPORT_DIR = os.getenv("LATENCY_REPORT_DIR", "latency_report")
+HTTP_CACHE_TTL = float(os.getenv("HTTP_CACHE_TTL", "60"))
+HTTP_CACHE_SIZE = int(os.getenv("HTTP_CACHE_SIZE", "256"))
+# Directory for per-worker access token files, empty to keep tokens in memory only.
+TOKEN_CACHE_DIR = os.getenv("TOKEN_CACHE_DIR", "")
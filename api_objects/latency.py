@@ -0,0 +1,156 @@
+import json
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import NamedTuple, Optional
+from urllib.parse import parse_qsl, urlsplit
+
+import requests
+
+# Path parameters collapsed into one route, matched after the "/api/1.0" prefix is removed.
+ROUTE_PATTERNS = [
+    (re.compile(r"^/products/(?!search$|details/?$)[^/]+$"), "/products/{category}"),
+    (re.compile(r"^/order/[^/]+$"), "/order/{order_number}"),
+    (re.compile(r"^/admin/product/[^/]+$"), "/admin/product/{product_id}"),
+]
+
+
+class Sample(NamedTuple):
+    route: str
+    status: int
+    elapsed_ms: float
+    size: int
+
+
+def normalize_route(method: str, url: str) -> str:
+    """Collapse a request into its route, e.g. "GET /products/women?paging=2" -> "GET /products/{category}?paging="."""
+    parts = urlsplit(url)
+    path = re.sub(r"^/api/[\d.]+", "", parts.path)
+    for pattern, route in ROUTE_PATTERNS:
+        if pattern.match(path):
+            path = route
+            break
+    query = "&".join(f"{key}=" for key, _ in parse_qsl(parts.query, keep_blank_values=True))
+    return f"{method} {path}" + (f"?{query}" if query else "")
+
+
+def percentile(sorted_values: list, percent: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    rank = max(math.ceil(percent / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def summarize(samples: list) -> dict:
+    by_route = defaultdict(list)
+    for sample in samples:
+        by_route[sample.route].append(sample)
+    summary = {}
+    for route, route_samples in sorted(by_route.items()):
+        elapsed = sorted(sample.elapsed_ms for sample in route_samples)
+        summary[route] = {
+            "count": len(elapsed),
+            "p50_ms": round(percentile(elapsed, 50), 1),
+            "p95_ms": round(percentile(elapsed, 95), 1),
+            "p99_ms": round(percentile(elapsed, 99), 1),
+            "max_ms": round(elapsed[-1], 1),
+            "avg_size_bytes": round(sum(sample.size for sample in route_samples) / len(route_samples)),
+            "status": dict(Counter(str(sample.status) for sample in route_samples)),
+        }
+    return summary
+
+
+class LatencyRecorder:
+    """Collect wall time, response size and status of every request made through RequestUtil."""
+
+    def __init__(self) -> None:
+        self.samples: list = []
+        self._lock = threading.Lock()
+
+    def record(self, method: str, url: str, elapsed: float, response: requests.Response) -> Sample:
+        sample = Sample(normalize_route(method, url), response.status_code, elapsed * 1000, len(response.content))
+        with self._lock:
+            self.samples.append(sample)
+        return sample
+
+    def summary(self) -> dict:
+        with self._lock:
+            return summarize(self.samples)
+
+    def dump_samples(self, report_dir: str, worker_id: str) -> None:
+        path = Path(report_dir)
+        path.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            (path / f"samples-{worker_id}.json").write_text(json.dumps(self.samples))
+
+
+class LatencyBudget:
+    """Latency budget of the running test, set from its ``latency_budget`` marker.
+
+    RequestUtil hands every sample to ``observe`` while a budget is active.
+    """
+
+    def __init__(self) -> None:
+        self.budget_ms: Optional[float] = None
+        self.samples: list = []
+        self._lock = threading.Lock()
+
+    def start(self, budget_ms: float) -> None:
+        with self._lock:
+            self.budget_ms = budget_ms
+            self.samples = []
+
+    def observe(self, sample: Sample) -> Optional[float]:
+        """Record the sample under the active budget.
+
+        The budget is read once under the lock, finish may reset it from another thread meanwhile.
+
+        Returns:
+            float: Return the budget the sample is over, None if it is within budget or no budget is active.
+        """
+        with self._lock:
+            budget_ms = self.budget_ms
+            if budget_ms is None:
+                return None
+            self.samples.append(sample)
+        return budget_ms if sample.elapsed_ms > budget_ms else None
+
+    def finish(self) -> dict:
+        """Stop observing and return the aggregate of the samples taken under the budget."""
+        with self._lock:
+            budget_ms, samples = self.budget_ms, self.samples
+            self.budget_ms, self.samples = None, []
+        elapsed = sorted(sample.elapsed_ms for sample in samples)
+        return {
+            "budget_ms": budget_ms,
+            "calls": len(samples),
+            "p95_ms": round(percentile(elapsed, 95), 1) if elapsed else None,
+            "max_ms": round(elapsed[-1], 1) if elapsed else None,
+            "violations": [
+                {"route": sample.route, "status": sample.status, "elapsed_ms": round(sample.elapsed_ms, 1)}
+                for sample in samples
+                if sample.elapsed_ms > budget_ms
+            ],
+        }
+
+
+def clear_samples(report_dir: str) -> None:
+    for sample_file in Path(report_dir).glob("samples-*.json"):
+        sample_file.unlink()
+
+
+def write_session_report(report_dir: str) -> dict:
+    """Merge the samples dumped by every worker into "latency_report.json"."""
+    samples = []
+    for sample_file in sorted(Path(report_dir).glob("samples-*.json")):
+        samples += [Sample(*sample) for sample in json.loads(sample_file.read_text())]
+    summary = summarize(samples)
+    path = Path(report_dir)
+    path.mkdir(parents=True, exist_ok=True)
+    (path / "latency_report.json").write_text(json.dumps(summary, indent=2))
+    return summary
+
+
+latency_recorder = LatencyRecorder()
+latency_budget = LatencyBudget()
@@ -2,13 +2,13 @@ import json
 
 import allure
 
-from api_objects.user import UserAPI
+from api_objects.user import AsyncUserAPI, UserAPI
 
 
 class OrderAPI(UserAPI):
     def __init__(self):
         super().__init__()
-        self.base_url = "http://54.201.140.239/api/1.0/order"
+        self.base_url = f"{self.host}/api/1.0/order"
 
     def make_an_order(self, payload):
         allure.attach(
@@ -22,3 +22,7 @@ class OrderAPI(UserAPI):
         # 雖然API Spec寫"order_id"，但checkout response跟database的名稱都是用order number
         # API Spec文件的用詞不一致
         return self.get(self.base_url + f"/{order_number}")
+
+
+class AsyncOrderAPI(AsyncUserAPI, OrderAPI):
+    pass
@@ -1,10 +1,19 @@
-from api_objects.request_util import RequestUtil
+import logging
+import time
+from collections import deque
+from typing import Callable, Iterator, Optional
+
+from api_objects.request_util import AsyncRequestUtil, RequestUtil
+from api_objects.response_cache import ResponseCache
 
 
 class ProductsAPI(RequestUtil):
+    # Opt-in, set a ResponseCache to reuse responses of identical product lookups.
+    cache: Optional[ResponseCache] = None
+
     def __init__(self):
         super().__init__()
-        self.base_url = "http://54.201.140.239/api/1.0/products/"
+        self.base_url = f"{self.host}/api/1.0/products/"
 
     def get_products_by_category(self, category=None, page=None):
         if category is None and page is None:
@@ -15,7 +24,7 @@ class ProductsAPI(RequestUtil):
             url = f"{self.base_url}{category}"
         else:
             url = f"{self.base_url}{category}?paging={page}"
-        return self.get(url)
+        return self._cached_get(url)
 
     def get_products_by_keyword(self, keyword=None, page=None):
         if keyword is None and page is None:
@@ -26,11 +35,98 @@ class ProductsAPI(RequestUtil):
             url = f"{self.base_url}search?keyword={keyword}"
         else:
             url = f"{self.base_url}search?keyword={keyword}&paging={page}"
-        return self.get(url)
+        return self._cached_get(url)
 
     def get_products_by_id(self, product_id=None):
         if product_id is None:
             url = f"{self.base_url}details/"
         else:
             url = f"{self.base_url}details/?id={product_id}"
-        return self.get(url)
+        return self._cached_get(url)
+
+    def paginate_products_by_category(self, category="all", concurrency: int = 4) -> "ProductPaginator":
+        return ProductPaginator(self, lambda page: f"{self.base_url}{category}?paging={page}", concurrency)
+
+    def paginate_products_by_keyword(self, keyword, concurrency: int = 4) -> "ProductPaginator":
+        return ProductPaginator(
+            self, lambda page: f"{self.base_url}search?keyword={keyword}&paging={page}", concurrency
+        )
+
+    def _cached_get(self, url):
+        if self.cache is None:
+            return self.get(url)
+        response, headers = self.cache.lookup(url)
+        if response is not None:
+            return response
+        response = self.cache.store(url, self.get(url, headers=headers))
+        if response is None:
+            response = self.cache.store(url, self.get(url))
+        return response
+
+
+class ProductPaginator:
+    """Walk every page of a product listing, fetching up to ``concurrency`` pages ahead.
+
+    Products are yielded in page order. The walk stops at the first empty page or the first page
+    without "next_paging". ``page_timings`` holds (page, elapsed_ms, product count) of each page read.
+    """
+
+    def __init__(self, api: ProductsAPI, url_of_page: Callable[[int], str], concurrency: int = 4) -> None:
+        if concurrency < 1:
+            raise ValueError(f"concurrency must be at least 1, got {concurrency}")
+        self.api = api
+        self.url_of_page = url_of_page
+        self.concurrency = concurrency
+        self.page_timings: list = []
+
+    def __iter__(self) -> Iterator[dict]:
+        pending: deque = deque()
+        next_page = 0
+
+        def fetch_ahead():
+            nonlocal next_page
+            url = self.url_of_page(next_page)
+            pending.append((next_page, url, self.api.transport.executor.submit(self._fetch, url)))
+            next_page += 1
+
+        for _ in range(self.concurrency):
+            fetch_ahead()
+        try:
+            while pending:
+                page, url, future = pending.popleft()
+                response, elapsed = future.result()
+                # Logged here rather than in the fetching thread so attachments land in the caller's step.
+                logging.info(f"GET {url}")
+                self.api._log_response(response)
+                if response.status_code != 200:
+                    raise Exception(f"Failed to get page {page}, status code is {response.status_code}")
+                body = response.json()
+                self.page_timings.append((page, round(elapsed * 1000, 1), len(body["data"])))
+                if not body["data"]:
+                    break
+                yield from body["data"]
+                if "next_paging" not in body:
+                    break
+                fetch_ahead()
+        finally:
+            for _, _, future in pending:
+                future.cancel()
+
+    def _fetch(self, url: str) -> tuple:
+        start = time.perf_counter()
+        response = self.api._request("GET", url)
+        return response, time.perf_counter() - start
+
+
+class AsyncProductsAPI(AsyncRequestUtil, ProductsAPI):
+    # The inherited lookups return "self._cached_get(url)", which is awaitable here.
+    async def _cached_get(self, url):
+        if self.cache is None:
+            return await self.get(url)
+        response, headers = self.cache.lookup(url)
+        if response is not None:
+            return response
+        response = self.cache.store(url, await self.get(url, headers=headers))
+        if response is None:
+            response = self.cache.store(url, await self.get(url))
+        return response
@@ -1,37 +1,154 @@
-import json
+import asyncio
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from http.cookiejar import DefaultCookiePolicy
+from typing import Optional
 
-import allure
 import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
 
+from api_objects.attachments import response_attacher
+from api_objects.config import HTTP_KEEP_ALIVE, HTTP_POOL_SIZE, STYLISH_API_HOST
+from api_objects.latency import latency_budget, latency_recorder
 
-class RequestUtil:
-    def __init__(self):
+
+class Transport:
+    """Pooled keep-alive connections shared by every API object of the process.
+
+    Each xdist worker is a separate process, so there is one shared transport per worker.
+    Auth headers are not stored here, every API object sends its own with each request.
+    """
+
+    _shared: Optional["Transport"] = None
+
+    def __init__(self, pool_size: int = HTTP_POOL_SIZE, keep_alive: bool = HTTP_KEEP_ALIVE) -> None:
+        self.pool_size = pool_size
         self.session = requests.Session()
+        # Cookies set for one API object must not leak into the others sharing this session.
+        self.session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, pool_block=True)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        if not keep_alive:
+            self.session.headers.update({"Connection": "close"})
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        # Sized like the connection pool so async callers never queue on a free thread without a socket.
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix="http")
+        return self._executor
+
+    @classmethod
+    def shared(cls) -> "Transport":
+        if cls._shared is None:
+            logging.info("Opening shared HTTP transport")
+            cls._shared = cls()
+        return cls._shared
+
+    @classmethod
+    def close_shared(cls) -> None:
+        if cls._shared is not None:
+            logging.info("Closing shared HTTP transport")
+            cls._shared.close()
+            cls._shared = None
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        return self.session.request(method, url, **kwargs)
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        self.session.close()
+
+
+class RequestUtil:
+    host: str = STYLISH_API_HOST
+
+    def __init__(self, transport: Optional[Transport] = None):
+        if transport is not None:
+            self.transport = transport
+        elif "transport" not in vars(self):
+            self.transport = Transport.shared()
+        self.headers: CaseInsensitiveDict = CaseInsensitiveDict()
 
     def post(self, url, **kwargs):
         logging.info(f"POST {url}")
-        res = self.session.post(url, **kwargs)
+        res = self._request("POST", url, **kwargs)
         self._log_response(res)
         return res
 
     def get(self, url, **kwargs):
         logging.info(f"GET {url}")
-        res = self.session.get(url, **kwargs)
+        res = self._request("GET", url, **kwargs)
         self._log_response(res)
         return res
 
     def delete(self, url, **kwargs):
         logging.info(f"DELETE {url}")
-        res = self.session.delete(url, **kwargs)
+        res = self._request("DELETE", url, **kwargs)
         self._log_response(res)
         return res
 
+    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        return self._send(method, url, self._merge_headers(kwargs), **kwargs)
+
+    def _send(self, method: str, url: str, headers: dict, **kwargs) -> requests.Response:
+        start = time.perf_counter()
+        res = self.transport.request(method, url, headers=headers, **kwargs)
+        sample = latency_recorder.record(method, url, time.perf_counter() - start, res)
+        budget_ms = latency_budget.observe(sample)
+        if budget_ms is not None:
+            logging.warning(f"{sample.route} took {sample.elapsed_ms:.0f} ms, over the {budget_ms} ms budget")
+        return res
+
+    def _merge_headers(self, kwargs: dict) -> dict:
+        return {**self.headers, **kwargs.pop("headers", {})}
+
     def _log_response(self, response: requests.Response):
         logging.info(f"Status code is {response.status_code}")
-        allure.attach(
-            json.dumps(dict(response.headers), indent=2),
-            "Response Headers",
-            attachment_type=allure.attachment_type.TEXT,
-        )
-        allure.attach(response.text, "Response Body", attachment_type=allure.attachment_type.TEXT)
+        response_attacher.attach(response)
+
+
+class AsyncRequestUtil(RequestUtil):
+    """Asyncio sibling of RequestUtil with the same get/post/delete surface.
+
+    The blocking send runs on the transport's thread pool, so many calls can be in flight from one
+    event loop. Logging and Allure attachments stay on the event loop thread, which keeps them inside
+    the current test step.
+    """
+
+    def __init__(self, transport: Optional[Transport] = None):
+        # The API subclasses call super().__init__() without arguments, so the injected transport is set
+        # first and RequestUtil.__init__ leaves it alone instead of opening the shared one.
+        if transport is not None:
+            self.transport = transport
+        super().__init__()
+
+    async def post(self, url, **kwargs):
+        logging.info(f"POST {url}")
+        res = await self._request_async("POST", url, **kwargs)
+        self._log_response(res)
+        return res
+
+    async def get(self, url, **kwargs):
+        logging.info(f"GET {url}")
+        res = await self._request_async("GET", url, **kwargs)
+        self._log_response(res)
+        return res
+
+    async def delete(self, url, **kwargs):
+        logging.info(f"DELETE {url}")
+        res = await self._request_async("DELETE", url, **kwargs)
+        self._log_response(res)
+        return res
+
+    async def _request_async(self, method: str, url: str, **kwargs) -> requests.Response:
+        # Headers are resolved before leaving the loop so a later login/logout can't race the send.
+        send = partial(self._send, method, url, self._merge_headers(kwargs), **kwargs)
+        return await asyncio.get_running_loop().run_in_executor(self.transport.executor, send)
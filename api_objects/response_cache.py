@@ -0,0 +1,93 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+import requests
+
+from api_objects.config import HTTP_CACHE_SIZE, HTTP_CACHE_TTL
+from api_objects.latency import normalize_route
+
+
+class _Entry(NamedTuple):
+    response: requests.Response
+    expires_at: float
+
+
+class ResponseCache:
+    """Opt-in cache for idempotent GETs with per-route TTL, LRU eviction and ETag revalidation.
+
+    Args:
+        max_entries: Least recently used URLs are evicted beyond this size.
+        default_ttl: Seconds a response is served without asking the server again.
+        route_ttls: TTL per normalized route, e.g. {"GET /products/details/?id=": 300}.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = HTTP_CACHE_SIZE,
+        default_ttl: float = HTTP_CACHE_TTL,
+        route_ttls: Optional[dict] = None,
+    ) -> None:
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.route_ttls = route_ttls or {}
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lookup(self, url: str) -> tuple:
+        """Return (fresh cached response, None) or (None, headers to send with the GET)."""
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None:
+                return None, {}
+            self._entries.move_to_end(url)
+            if time.monotonic() < entry.expires_at:
+                self.hits += 1
+                logging.info(f"GET {url} served from cache")
+                return entry.response, None
+            etag = entry.response.headers.get("ETag")
+            return None, {"If-None-Match": etag} if etag else {}
+
+    def store(self, url: str, response: requests.Response) -> Optional[requests.Response]:
+        """Cache a fresh response, or renew the cached one on "304 Not Modified". Return the response to use.
+
+        Returns None for a 304 whose entry was evicted after lookup(), the caller must GET the URL again
+        without If-None-Match.
+        """
+        with self._lock:
+            entry = self._entries.get(url)
+            if response.status_code == 304:
+                if entry is None:
+                    logging.info(f"GET {url} was evicted while revalidating")
+                    return None
+                self.revalidations += 1
+                response = entry.response
+            else:
+                self.misses += 1
+                if response.status_code != 200:
+                    return response
+            self._entries[url] = _Entry(response, time.monotonic() + self._ttl_of(url))
+            self._entries.move_to_end(url)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return response
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidations": self.revalidations,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _ttl_of(self, url: str) -> float:
+        return self.route_ttls.get(normalize_route("GET", url), self.default_ttl)
@@ -0,0 +1,77 @@
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Optional
+
+from api_objects.user import UserAPI
+
+
+class TokenCache:
+    """Access tokens keyed by account email, shared by every login in one worker.
+
+    A cached token is checked with a /user/profile call before it is reused and the account logs in
+    again only when the token is rejected. Tests covering login or logout call UserAPI.login directly.
+
+    Args:
+        path (str, optional): JSON file the tokens are also kept in, so they survive between sessions.
+    """
+
+    # /user/profile answers 401 without a token and 403 for one that was revoked by a later login or logout.
+    REJECTED = (401, 403)
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = Path(path) if path else None
+        self._lock = threading.Lock()
+        self._tokens = {}
+        if self.path is not None and self.path.exists():
+            self._tokens = json.loads(self.path.read_text(encoding="utf-8"))
+
+    def login(self, api: UserAPI, account: dict) -> int:
+        """Authorize an API object as the account, reusing a cached token when it is still valid.
+
+        Args:
+            api (UserAPI): Any API object based on UserAPI.
+            account (dict): Account info with "email" and "password".
+
+        Returns:
+            int: Return 200 if authorized, else the status code of the login call.
+        """
+        with self._lock:
+            cached = self._tokens.get(account["email"])
+        if cached is not None:
+            result = api.get_profile(token=cached["access_token"])
+            if not isinstance(result, int):
+                logging.info(f"Reuse cached access token of {account['email']}")
+                api.access_token, api.loggedin_user = cached["access_token"], cached["user"]
+                return 200
+            if result not in self.REJECTED:
+                raise Exception(f"Unexpected status {result} while checking the cached token.")
+            api.headers.pop("authorization")
+            self.invalidate(account["email"])
+        api.set_login_request_body({**account, "provider": "native"})
+        status_code = api.login()
+        if status_code == 200:
+            self.store(account["email"], api.get_access_token(), api.get_loggedin_user_data())
+        return status_code
+
+    def get_token(self, api: UserAPI, account: dict) -> str:
+        """Get a valid access token of the account, e.g. to put it in the browser's local storage."""
+        if self.login(api, account) != 200:
+            raise Exception(f"Failed to login as {account['email']}.")
+        return api.get_access_token()
+
+    def store(self, email: str, access_token: str, user: dict) -> None:
+        with self._lock:
+            self._tokens[email] = {"access_token": access_token, "user": user}
+            self._save()
+
+    def invalidate(self, email: str) -> None:
+        with self._lock:
+            self._tokens.pop(email, None)
+            self._save()
+
+    def _save(self) -> None:
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.write_text(json.dumps(self._tokens, indent=2), encoding="utf-8")
@@ -0,0 +1,109 @@
+import hashlib
+import logging
+import mimetypes
+import mmap
+import os
+import uuid
+from typing import Iterable, Optional
+
+import allure
+
+# Content hashes of the files already attached to the report by this process. Under xdist that is one
+# xdist worker, so each worker attaches a file once.
+_attached_digests = set()
+# (path, size, mtime) -> sha256, so a file is hashed once however many tests upload it.
+_digests = {}
+
+
+class MappedFile:
+    """Read-only memory map of a file, readable like a file object for uploads.
+
+    Args:
+        path (str): Path of the file to map.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.name = path
+        with open(path, "rb") as file:
+            size = os.fstat(file.fileno()).st_size
+            # An empty file cannot be mapped.
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        self.size = size
+        self.view = memoryview(self._map) if self._map is not None else memoryview(b"")
+
+    @property
+    def digest(self) -> str:
+        stat = os.stat(self.name)
+        key = (self.name, stat.st_size, stat.st_mtime_ns)
+        if key not in _digests:
+            _digests[key] = hashlib.sha256(self.view).hexdigest()
+        return _digests[key]
+
+    def close(self) -> None:
+        self.view.release()
+        if self._map is not None:
+            self._map.close()
+
+    def __enter__(self) -> "MappedFile":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class MultipartStream:
+    """multipart/form-data body that requests sends chunk by chunk instead of building it in memory.
+
+    File parts are slices of memory-mapped files, so the images are never copied into one big buffer.
+
+    Args:
+        fields (dict): Form fields, a list value becomes one part per item.
+        files (Iterable): (field name, MappedFile) pairs.
+    """
+
+    def __init__(self, fields: dict, files: Iterable) -> None:
+        boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={boundary}"
+        self._parts = []
+        for name, values in fields.items():
+            for value in values if isinstance(values, list) else [values]:
+                self._add_part(boundary, f'form-data; name="{name}"', None, str(value).encode("utf-8"))
+        for name, file in files:
+            filename = os.path.basename(file.name)
+            content_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+            self._add_part(boundary, f'form-data; name="{name}"; filename="{filename}"', content_type, file.view)
+        self._parts.append(f"--{boundary}--\r\n".encode())
+        # requests reads this to send a Content-Length header instead of chunked transfer encoding.
+        self.len = sum(len(part) for part in self._parts)
+        self._index, self._offset = 0, 0
+
+    def read(self, size: int = -1) -> bytes:
+        chunks, wanted = [], self.len if size is None or size < 0 else size
+        while wanted > 0 and self._index < len(self._parts):
+            part = self._parts[self._index]
+            chunk = part[self._offset : self._offset + wanted]
+            chunks.append(bytes(chunk))
+            wanted -= len(chunk)
+            self._offset += len(chunk)
+            if self._offset == len(part):
+                self._index, self._offset = self._index + 1, 0
+        return b"".join(chunks)
+
+    def _add_part(self, boundary: str, disposition: str, content_type: Optional[str], body) -> None:
+        header = f"--{boundary}\r\nContent-Disposition: {disposition}\r\n"
+        if content_type is not None:
+            header += f"Content-Type: {content_type}\r\n"
+        self._parts.extend([f"{header}\r\n".encode("utf-8"), body, b"\r\n"])
+
+
+def attach_file_once(file: MappedFile) -> None:
+    """Attach a file to the Allure report unless this process already attached a file with the same content.
+
+    The copy into the report directory is made by the BackgroundFileLogger when it is installed.
+    """
+    name = os.path.basename(file.name)
+    if file.digest in _attached_digests:
+        logging.info(f"{name} ({file.digest[:12]}) is already attached")
+        return
+    _attached_digests.add(file.digest)
+    allure.attach.file(file.name, f"{name} ({file.digest[:12]})", extension=os.path.splitext(name)[1].lstrip("."))
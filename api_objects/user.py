@@ -4,13 +4,13 @@ from typing import Optional
 
 import allure
 
-from api_objects.request_util import RequestUtil
+from api_objects.request_util import AsyncRequestUtil, RequestUtil
 
 
 class UserAPI(RequestUtil):
     def __init__(self):
         super().__init__()
-        self.base_url = "http://54.201.140.239/api/1.0/user/"
+        self.base_url = f"{self.host}/api/1.0/user/"
         self.login_api = self.base_url + "login"
         self.logout_api = self.base_url + "logout"
         self.profile_api = self.base_url + "profile"
@@ -22,16 +22,8 @@ class UserAPI(RequestUtil):
         )
 
     def login(self) -> int:
-        if hasattr(self, "payload"):
-            response = self.post(self.login_api, json=self.payload)
-        else:
-            Exception("Please set login info first.")
-        if response.status_code == 200:
-            response_body = response.json()["data"]
-            self.session.headers.update({"authorization": f'Bearer {response_body["access_token"]}'})
-            self.access_token = response_body["access_token"]
-            self.loggedin_user = response_body["user"]
-        return response.status_code
+        self._check_login_request_body()
+        return self._handle_login_response(self.post(self.login_api, json=self.payload))
 
     def get_access_token(self) -> str:
         return self.access_token if hasattr(self, "access_token") else ""
@@ -43,31 +35,68 @@ class UserAPI(RequestUtil):
             raise Exception("You have not logged in successfully yet.")
 
     def logout(self, token: Optional[str] = None) -> int:
+        has_token = self._prepare_logout(token)
+        return self._handle_logout_response(self.post(self.logout_api), has_token)
+
+    def get_profile(self, token: Optional[str] = None):
+        self._prepare_get_profile(token)
+        return self._handle_profile_response(self.get(self.profile_api))
+
+    def _check_login_request_body(self) -> None:
+        if not hasattr(self, "payload"):
+            raise Exception("Please set login info first.")
+
+    def _handle_login_response(self, response) -> int:
+        if response.status_code == 200:
+            response_body = response.json()["data"]
+            self.headers.update({"authorization": f'Bearer {response_body["access_token"]}'})
+            self.access_token = response_body["access_token"]
+            self.loggedin_user = response_body["user"]
+        return response.status_code
+
+    def _prepare_logout(self, token: Optional[str]) -> bool:
         if token is not None:
             self.access_token = token
-            self.session.headers.update({"authorization": f"Bearer {token}"})
-        if self.session.headers.get("authorization", None) is not None:
-            logging.info(f"Logout with access token: {self.session.headers['authorization']}")
-            response = self.post(self.logout_api)
-            delattr(self, "access_token")
-            self.session.headers.pop("authorization")
+            self.headers.update({"authorization": f"Bearer {token}"})
+        if self.headers.get("authorization", None) is not None:
+            logging.info(f"Logout with access token: {self.headers['authorization']}")
+            return True
         else:
             logging.info("Logout without access token")
-            response = self.post(self.logout_api)
+            return False
+
+    def _handle_logout_response(self, response, has_token: bool) -> int:
+        if has_token:
+            delattr(self, "access_token")
+            self.headers.pop("authorization")
         if response.status_code == 200:
             delattr(self, "loggedin_user")
         return response.status_code
 
-    def get_profile(self, token: Optional[str] = None):
+    def _prepare_get_profile(self, token: Optional[str]) -> None:
         if token is not None:
-            self.session.headers.update({"authorization": f"Bearer {token}"})
-        if self.session.headers.get("authorization", None) is not None:
-            logging.info(f"Get profile with access token: {self.session.headers['authorization']}")
-            response = self.get(self.profile_api)
+            self.headers.update({"authorization": f"Bearer {token}"})
+        if self.headers.get("authorization", None) is not None:
+            logging.info(f"Get profile with access token: {self.headers['authorization']}")
         else:
             logging.info("Get profile without access token")
-            response = self.get(self.profile_api)
+
+    def _handle_profile_response(self, response):
         if response.status_code == 200:
             return response.status_code, response.json()["data"]
         else:
             return response.status_code
+
+
+class AsyncUserAPI(AsyncRequestUtil, UserAPI):
+    async def login(self) -> int:
+        self._check_login_request_body()
+        return self._handle_login_response(await self.post(self.login_api, json=self.payload))
+
+    async def logout(self, token: Optional[str] = None) -> int:
+        has_token = self._prepare_logout(token)
+        return self._handle_logout_response(await self.post(self.logout_api), has_token)
+
+    async def get_profile(self, token: Optional[str] = None):
+        self._prepare_get_profile(token)
+        return self._handle_profile_response(await self.get(self.profile_api))
@@ -0,0 +1,102 @@
+import json
+import logging
+import os
+from typing import Optional
+
+import allure
+import pytest
+
+from api_objects.attachments import install_background_file_logger, response_attacher
+from api_objects.config import TOKEN_CACHE_DIR
+from api_objects.token_cache import TokenCache
+from database.catalog import load_catalog
+from database.config import CATALOG_CACHE_DIR
+from database.local_schema import create_local_database
+from database.stylish_backend import StylishBackend
+from local_server.stylish_server import load_snapshot
+
+catalog_dir_key = pytest.StashKey[Optional[str]]()
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--stylish-snapshot",
+        action="store",
+        default=None,
+        help="Read the DB from a SQLite copy of this DB snapshot and run the API tests against a local stand-in server",
+    )
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_configure(config):
+    install_background_file_logger(config)
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node):
+    # The controller refreshes the catalog snapshot once, workers map its files without querying the DB.
+    if node.config.getoption("stylish_snapshot") is not None or StylishBackend.url is None:
+        # Each worker reads its own local database then, or no test can use the catalog.
+        return
+    if catalog_dir_key not in node.config.stash:
+        try:
+            StylishBackend().get_cached_catalog(CATALOG_CACHE_DIR)
+            node.config.stash[catalog_dir_key] = CATALOG_CACHE_DIR
+        except Exception as e:
+            # The controller does not collect, so it cannot tell whether a test needs the catalog. If one does, the
+            # catalog fixture of its worker refreshes the snapshot under the file lock and reports the error.
+            logging.warning(f"Catalog snapshot not refreshed before starting the workers: {e!r}")
+            node.config.stash[catalog_dir_key] = None
+    if node.config.stash[catalog_dir_key] is not None:
+        node.workerinput["catalog_dir"] = node.config.stash[catalog_dir_key]
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    report = (yield).get_result()
+    # Responses from a passing setup are kept for the call phase, so a failing test shows them too.
+    if report.when != "setup" or report.failed:
+        response_attacher.flush(failed=report.failed)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def local_database(request, tmp_path_factory):
+    # With --stylish-snapshot, StylishBackend reads a SQLite copy of the snapshot instead of MySQL.
+    snapshot = request.config.getoption("stylish_snapshot")
+    if snapshot is None:
+        yield None
+        return
+    url = create_local_database(tmp_path_factory.mktemp("stylish_db") / "stylish.db", load_snapshot(snapshot))
+    original_url, StylishBackend.url = StylishBackend.url, url
+    StylishBackend.dispose_shared_engine()
+    yield url
+    StylishBackend.dispose_shared_engine()
+    StylishBackend.url = original_url
+
+
+@pytest.fixture(scope="session", autouse=True)
+def db_pool():
+    yield
+    stats = StylishBackend.pool_stats()
+    if stats:
+        logging.info(f"DB pool stats: {stats}")
+        allure.attach(json.dumps(stats, indent=2), "DB Pool Stats", attachment_type=allure.attachment_type.JSON)
+    StylishBackend.dispose_shared_engine()
+
+
+@pytest.fixture(scope="session")
+def database():
+    return StylishBackend()
+
+
+@pytest.fixture(scope="session")
+def catalog(request, database):
+    workerinput = getattr(request.config, "workerinput", {})
+    if "catalog_dir" in workerinput:
+        return load_catalog(workerinput["catalog_dir"])
+    return database.get_cached_catalog()
+
+
+@pytest.fixture(scope="session")
+def token_cache(worker_id):
+    return TokenCache(os.path.join(TOKEN_CACHE_DIR, f"tokens-{worker_id}.json") if TOKEN_CACHE_DIR else None)
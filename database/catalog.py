@@ -0,0 +1,217 @@
+import fcntl
+import json
+import logging
+import os
+import shutil
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+# One narrow query per table, ordered so images and variants keep a stable order per product.
+CATALOG_QUERIES = {
+    "products": """
+        SELECT id, category, title, description, price, texture, wash, place, note, story, main_image
+          FROM product
+         ORDER BY id;
+        """,
+    "images": """
+        SELECT id AS image_id, product_id AS id, image
+          FROM product_images
+         ORDER BY product_id, id;
+        """,
+    "variants": """
+        SELECT id AS variant_id, product_id AS id, color_id, size, stock
+          FROM variant
+         ORDER BY product_id, id;
+        """,
+    "colors": """
+        SELECT id AS color_id, code AS color_code, name AS color_name
+          FROM color
+         ORDER BY id;
+        """,
+}
+# Cheap enough to run every session. Counts and max ids change when rows are added or removed, the sums change
+# on in-place UPDATEs too: stock (weighted by variant id, so moving stock between variants counts), prices,
+# colors and sizes of variants, and the length of every text column. Plain SQL, it runs on MySQL and SQLite.
+FINGERPRINT_QUERY = """
+    SELECT (SELECT COUNT(*) FROM product) AS products,
+           (SELECT MAX(id) FROM product) AS max_product_id,
+           (SELECT SUM(price) FROM product) AS price_sum,
+           (SELECT SUM(LENGTH(category)) + SUM(LENGTH(title)) + SUM(LENGTH(description)) + SUM(LENGTH(texture))
+                   + SUM(LENGTH(wash)) + SUM(LENGTH(place)) + SUM(LENGTH(note)) + SUM(LENGTH(story))
+                   + SUM(LENGTH(main_image))
+              FROM product) AS product_text_length,
+           (SELECT COUNT(*) FROM product_images) AS images,
+           (SELECT SUM(LENGTH(image)) FROM product_images) AS image_name_length,
+           (SELECT COUNT(*) FROM variant) AS variants,
+           (SELECT MAX(id) FROM variant) AS max_variant_id,
+           (SELECT SUM(stock) FROM variant) AS stock_sum,
+           (SELECT SUM(id * stock) FROM variant) AS weighted_stock_sum,
+           (SELECT SUM(id * color_id) FROM variant) AS weighted_color_sum,
+           (SELECT SUM(id * LENGTH(size)) FROM variant) AS weighted_size_length,
+           (SELECT COUNT(*) FROM color) AS colors,
+           (SELECT SUM(LENGTH(code)) + SUM(LENGTH(name)) FROM color) AS color_text_length;
+    """
+# Bumped when the files written by save_catalog change, older snapshots are refreshed.
+SNAPSHOT_FORMAT = 2
+# Columns of StylishBackend.get_all_product_detail, in its order.
+# fmt: off
+DETAIL_COLUMNS = [
+    "id", "category", "title", "description", "price", "texture", "wash", "place", "note", "story", "main_image",
+    "image_id", "image", "variant_id", "color_code", "size", "stock", "color_name",
+]
+# fmt: on
+
+
+class Catalog:
+    """Product catalog holding each table once, plus the images x variants rows of their join.
+
+    Only products with at least one image and one variant are listed, like the inner join of
+    StylishBackend.get_all_product_detail. Text columns are categoricals, so a catalog loaded from a snapshot maps
+    their integer codes like the numeric columns and keeps only the distinct values in memory.
+
+    Args:
+        tables (dict): "products", "images", "variants" with their color and "detail" DataFrames made by build.
+        fingerprint (dict, optional): Result of FINGERPRINT_QUERY the tables were fetched at.
+    """
+
+    def __init__(self, tables: dict, fingerprint: Optional[dict] = None) -> None:
+        self.tables = tables
+        self.fingerprint = fingerprint
+        # set_index would copy every column, set_axis keeps the mapped ones.
+        self.products = tables["products"].set_axis(tables["products"]["id"], axis=0, copy=False)
+        self.images = tables["images"]
+        self.variants = tables["variants"]
+
+    @classmethod
+    def build(cls, tables: dict, fingerprint: Optional[dict] = None) -> "Catalog":
+        """Filter and join the tables fetched with CATALOG_QUERIES, done once per snapshot.
+
+        Returns:
+            Catalog: Return the product catalog.
+        """
+        tables = {
+            name: table.astype({column: "category" for column, dtype in table.dtypes.items() if dtype == object})
+            for name, table in tables.items()
+        }
+        # Variants of an unknown color are dropped like by the INNER JOIN on color. The merge below is a left
+        # one only because it keeps the variant order, an inner merge would group variants by color.
+        variants = tables["variants"][tables["variants"]["color_id"].isin(tables["colors"]["color_id"])]
+        listed = set(tables["images"]["id"]) & set(variants["id"])
+        products = tables["products"][tables["products"]["id"].isin(listed)].reset_index(drop=True)
+        images = tables["images"][tables["images"]["id"].isin(listed)].reset_index(drop=True)
+        variants = variants[variants["id"].isin(listed)].merge(tables["colors"], on="color_id", how="left")
+        detail = products.merge(images, on="id").merge(variants, on="id")[DETAIL_COLUMNS]
+        return cls({"products": products, "images": images, "variants": variants, "detail": detail}, fingerprint)
+
+    @property
+    def ids(self) -> list:
+        return self.products.index.tolist()
+
+    def product_names(self) -> pd.DataFrame:
+        """Get id, category and title of each product, indexed by id."""
+        return self.products[["category", "title"]]
+
+    def color_code_dict(self) -> dict:
+        """Get the color code of each color name used by a variant."""
+        colors = self.variants[["color_name", "color_code"]].drop_duplicates(subset="color_name")
+        return colors.set_index("color_name")["color_code"].to_dict()
+
+    def product_detail(self) -> pd.DataFrame:
+        """Get the rows of StylishBackend.get_all_product_detail.
+
+        Returns:
+            DataFrame: Return one row per image and variant of each product, columns set on it stay in the copy.
+        """
+        return self.tables["detail"].copy(deep=False)
+
+
+@contextmanager
+def catalog_lock(cache_dir: str) -> Iterator[None]:
+    """Hold an exclusive lock on the catalog cache, shared by every process on this machine."""
+    Path(cache_dir).mkdir(parents=True, exist_ok=True)
+    with open(Path(cache_dir) / "catalog.lock", "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def save_catalog(catalog: Catalog, cache_dir: str) -> None:
+    """Write the catalog tables to cache_dir as one .npy file per column.
+
+    Categorical columns are stored as their integer codes plus a file of categories, so every column can be
+    memory-mapped. manifest.json is replaced last, which makes the new snapshot visible atomically.
+    """
+    snapshot_dir = Path(cache_dir) / uuid.uuid4().hex
+    snapshot_dir.mkdir(parents=True)
+    columns = {}
+    for name, table in catalog.tables.items():
+        columns[name] = {}
+        for column, values in table.items():
+            is_categorical = isinstance(values.dtype, pd.CategoricalDtype)
+            if is_categorical:
+                np.save(snapshot_dir / f"{name}.{column}.npy", values.cat.codes.to_numpy())
+                np.save(snapshot_dir / f"{name}.{column}.categories.npy", values.cat.categories.to_numpy(dtype=str))
+            else:
+                np.save(snapshot_dir / f"{name}.{column}.npy", values.to_numpy())
+            columns[name][column] = {"categorical": is_categorical}
+    manifest = Path(cache_dir) / "manifest.json"
+    previous = json.loads(manifest.read_text())["directory"] if manifest.exists() else None
+    manifest_tmp = manifest.with_suffix(".tmp")
+    manifest_tmp.write_text(
+        json.dumps(
+            {
+                "format": SNAPSHOT_FORMAT,
+                "fingerprint": catalog.fingerprint,
+                "directory": snapshot_dir.name,
+                "columns": columns,
+            }
+        )
+    )
+    os.replace(manifest_tmp, manifest)
+    # Processes still mapping the old files keep their pages after the files are unlinked.
+    if previous is not None:
+        shutil.rmtree(Path(cache_dir) / previous, ignore_errors=True)
+
+
+def load_catalog(cache_dir: str, fingerprint: Optional[dict] = None) -> Optional[Catalog]:
+    """Memory-map the catalog snapshot in cache_dir.
+
+    Numeric columns and the codes of categorical ones stay mapped, the processes sharing a snapshot share its pages.
+
+    Args:
+        cache_dir (str): Directory written by save_catalog.
+        fingerprint (dict, optional): Expected fingerprint, None to accept any snapshot.
+
+    Returns:
+        Catalog: Return the catalog, or None if there is no snapshot or it has another fingerprint.
+    """
+    manifest_path = Path(cache_dir) / "manifest.json"
+    if not manifest_path.exists():
+        return None
+    manifest = json.loads(manifest_path.read_text())
+    if manifest.get("format") != SNAPSHOT_FORMAT:
+        logging.info(f"Catalog snapshot has format {manifest.get('format')}, expected {SNAPSHOT_FORMAT}")
+        return None
+    if fingerprint is not None and manifest["fingerprint"] != fingerprint:
+        logging.info(f"Catalog snapshot is stale: {manifest['fingerprint']} != {fingerprint}")
+        return None
+    snapshot_dir = Path(cache_dir) / manifest["directory"]
+    tables = {}
+    for name, columns in manifest["columns"].items():
+        data = {}
+        for column, kind in columns.items():
+            values = np.load(snapshot_dir / f"{name}.{column}.npy", mmap_mode="r")
+            if kind["categorical"]:
+                categories = pd.Index(np.load(snapshot_dir / f"{name}.{column}.categories.npy"))
+                values = pd.Categorical.from_codes(values, categories=categories)
+            data[column] = values
+        # copy=False keeps one block per column instead of consolidating, and copying, columns of a dtype.
+        tables[name] = pd.DataFrame(data, columns=list(columns), copy=False)
+    return Catalog(tables, manifest["fingerprint"])
@@ -4,3 +4,13 @@ from dotenv import load_dotenv
 
 load_dotenv()
 STYLISH_DB_URL = os.getenv("STYLISH_DB_URL")
+STYLISH_DB_POOL_SIZE = int(os.getenv("STYLISH_DB_POOL_SIZE", "5"))
+STYLISH_DB_MAX_OVERFLOW = int(os.getenv("STYLISH_DB_MAX_OVERFLOW", "5"))
+STYLISH_DB_POOL_TIMEOUT = float(os.getenv("STYLISH_DB_POOL_TIMEOUT", "30"))
+# Seconds before a pooled connection is replaced, kept below MySQL's wait_timeout.
+STYLISH_DB_POOL_RECYCLE = int(os.getenv("STYLISH_DB_POOL_RECYCLE", "1800"))
+CATALOG_CACHE_DIR = os.getenv("CATALOG_CACHE_DIR", ".catalog_cache")
+# Seconds to keep polling for rows written by the API under test, e.g. a just created order.
+STYLISH_DB_WAIT_TIMEOUT = float(os.getenv("STYLISH_DB_WAIT_TIMEOUT", "5"))
+# Products inserted per transaction by StylishSeeder.
+STYLISH_SEED_BATCH_SIZE = int(os.getenv("STYLISH_SEED_BATCH_SIZE", "500"))
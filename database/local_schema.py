@@ -0,0 +1,109 @@
+import json
+import sys
+from pathlib import Path
+
+from sqlalchemy import create_engine, text
+
+from database.stylish_backend import SNAPSHOT_TABLES
+
+# SQLite version of the tables StylishBackend reads, with the columns of SNAPSHOT_TABLES.
+SCHEMA = [
+    """
+    CREATE TABLE product (
+        id INTEGER PRIMARY KEY,
+        category TEXT NOT NULL,
+        title TEXT NOT NULL,
+        description TEXT,
+        price INTEGER,
+        texture TEXT,
+        wash TEXT,
+        place TEXT,
+        note TEXT,
+        story TEXT,
+        main_image TEXT
+    );
+    """,
+    """
+    CREATE TABLE product_images (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        product_id INTEGER NOT NULL,
+        image TEXT
+    );
+    """,
+    """
+    CREATE TABLE variant (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        product_id INTEGER NOT NULL,
+        color_id INTEGER NOT NULL,
+        size TEXT,
+        stock INTEGER
+    );
+    """,
+    """
+    CREATE TABLE color (
+        id INTEGER PRIMARY KEY,
+        code TEXT,
+        name TEXT
+    );
+    """,
+    """
+    CREATE TABLE user (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        provider TEXT,
+        email TEXT,
+        name TEXT,
+        picture TEXT,
+        access_token TEXT
+    );
+    """,
+    """
+    CREATE TABLE order_table (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        number TEXT NOT NULL,
+        time BIGINT,
+        status INTEGER,
+        details TEXT,
+        user_id INTEGER,
+        total INTEGER
+    );
+    """,
+    "CREATE INDEX product_images_product_id ON product_images (product_id);",
+    "CREATE INDEX variant_product_id ON variant (product_id);",
+    "CREATE INDEX user_email ON user (email);",
+    "CREATE UNIQUE INDEX order_table_number ON order_table (number);",
+]
+
+
+def create_local_database(path, snapshot: dict) -> str:
+    """Create the Stylish tables in a SQLite file and fill them from a snapshot.
+
+    Args:
+        path: SQLite file to create, replaced if it exists.
+        snapshot (dict): Rows per table, as written by StylishBackend.export_snapshot.
+
+    Returns:
+        str: Return the database URL, to set as StylishBackend.url.
+    """
+    Path(path).unlink(missing_ok=True)
+    url = f"sqlite:///{Path(path).resolve()}"
+    engine = create_engine(url)
+    with engine.begin() as connection:
+        for statement in SCHEMA:
+            connection.execute(text(statement))
+        for table, columns in SNAPSHOT_TABLES.items():
+            names = [column.strip() for column in columns.split(",")]
+            rows = [{name: row.get(name) for name in names} for row in snapshot.get(table, [])]
+            if rows:
+                insert = f"INSERT INTO {table} ({', '.join(names)}) VALUES ({', '.join(':' + n for n in names)});"
+                connection.execute(text(insert), rows)
+    engine.dispose()
+    return url
+
+
+def _main():
+    # python -m database.local_schema <snapshot.json> <stylish.db>
+    print(create_local_database(sys.argv[2], json.loads(Path(sys.argv[1]).read_text(encoding="utf-8"))))
+
+
+if __name__ == "__main__":
+    _main()
@@ -0,0 +1,58 @@
+import json
+
+import pandas as pd
+
+from database.catalog import Catalog
+
+PRODUCT_COLUMNS = ["id", "category", "title", "description", "price", "texture", "wash", "place", "note", "story"]
+# (catalog fingerprint, asset host) -> product index
+_indexes = {}
+
+
+def build_product_index(catalog: Catalog, asset_host: str) -> dict:
+    """Build the expected /products/details payload of every product in one pass per table.
+
+    The result is memoized per catalog snapshot, so category, keyword and detail expectations are dict lookups.
+
+    Args:
+        catalog (Catalog): Product catalog.
+        asset_host (str): Host the image URLs of the payload point to.
+
+    Returns:
+        Dict: Return {product id: payload}, in the order of the catalog.
+    """
+    key = (json.dumps(catalog.fingerprint, sort_keys=True), asset_host)
+    if catalog.fingerprint is not None and key in _indexes:
+        return _indexes[key]
+    products, images, variants = catalog.products, catalog.images, catalog.variants
+
+    # Text columns are categoricals, which have no string concatenation.
+    image_urls = asset_host + "/assets/" + images["id"].astype(str) + "/" + images["image"].astype(str)
+    images_of = image_urls.groupby(images["id"], sort=False).agg(list)
+    variant_records = pd.Series(variants[["color_code", "size", "stock"]].to_dict("records"), index=variants["id"])
+    variants_of = variant_records.groupby(level=0, sort=False).agg(list)
+    colors = variants.drop_duplicates(subset=["id", "color_code"])
+    color_records = pd.Series(
+        colors[["color_code", "color_name"]].set_axis(["code", "name"], axis=1).to_dict("records"), index=colors["id"]
+    )
+    colors_of = color_records.groupby(level=0, sort=False).agg(list)
+    sizes_of = variants.drop_duplicates(subset=["id", "size"]).groupby("id", sort=False)["size"].agg(list)
+
+    details = products[PRODUCT_COLUMNS].assign(
+        main_image=asset_host + "/assets/" + products["id"].astype(str) + "/" + products["main_image"].astype(str)
+    )
+    # Missing categorical values are NaN, the API returns them as null.
+    details = details.astype(object).where(details.notna(), None)
+    index = {
+        detail["id"]: {
+            **detail,
+            "images": images_of[detail["id"]],
+            "variants": variants_of[detail["id"]],
+            "colors": colors_of[detail["id"]],
+            "sizes": sizes_of[detail["id"]],
+        }
+        for detail in details.to_dict("records")
+    }
+    if catalog.fingerprint is not None:
+        _indexes[key] = index
+    return index
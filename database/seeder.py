@@ -0,0 +1,142 @@
+import itertools
+import logging
+import os
+import time
+import uuid
+from typing import Optional
+
+from sqlalchemy import text
+
+from database.config import STYLISH_SEED_BATCH_SIZE
+from database.stylish_backend import StylishBackend
+
+CATEGORIES = ("women", "men", "accessories")
+INSERT_PRODUCT = text(
+    """
+    INSERT INTO product (id, category, title, description, price, texture, wash, place, note, story, main_image)
+    VALUES (:id, :category, :title, :description, :price, :texture, :wash, :place, :note, :story, :main_image);
+    """
+)
+INSERT_IMAGE = text(
+    """
+    INSERT INTO product_images (product_id, image)
+    VALUES (:product_id, :image);
+    """
+)
+INSERT_VARIANT = text(
+    """
+    INSERT INTO variant (product_id, color_id, size, stock)
+    VALUES (:product_id, :color_id, :size, :stock);
+    """
+)
+# Children first, the product rows are what carries the tag.
+DELETE_BY_TAG = [
+    text("DELETE FROM variant WHERE product_id IN (SELECT id FROM product WHERE note = :tag);"),
+    text("DELETE FROM product_images WHERE product_id IN (SELECT id FROM product WHERE note = :tag);"),
+    text("DELETE FROM product WHERE note = :tag;"),
+]
+COLOR_IDS = text("SELECT id FROM color ORDER BY id;")
+
+
+class StylishSeeder:
+    """Insert products, images and variants in bulk, tagged with a run id so they can be deleted together.
+
+    Products are written straight to the database with executemany, one transaction per batch. Their note
+    column holds the tag, since the schema has no column of its own for it.
+
+    Args:
+        run_id (str, optional): Identifies the seeded rows, a random one by default.
+        batch_size (int): Products inserted per transaction.
+        worker (int): Index of this seeder among the ones seeding at the same time, e.g. the xdist worker.
+        workers (int): How many seeders seed at the same time, each one only uses ids equal to worker modulo workers.
+    """
+
+    def __init__(
+        self,
+        run_id: Optional[str] = None,
+        batch_size: int = STYLISH_SEED_BATCH_SIZE,
+        worker: int = 0,
+        workers: int = 1,
+    ) -> None:
+        if not 0 <= worker < workers:
+            raise ValueError(f"worker must be in [0, {workers}), got {worker}")
+        self.backend = StylishBackend()
+        self.run_id = run_id if run_id is not None else f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.tag = f"seed:{self.run_id}"
+        self.batch_size = batch_size
+        self.worker = worker
+        self.workers = workers
+        self.product_ids = []
+        self._next_id = 0
+
+    def seed_products(
+        self, count: int, images_per_product: int = 2, sizes: tuple = ("S", "M", "L"), color_count: int = 3
+    ) -> list:
+        """Insert count products with their images and variants.
+
+        Args:
+            count (int): How many products to insert.
+            images_per_product (int): Other images of each product.
+            sizes (tuple): Sizes of each product, every size is a variant of every color.
+            color_count (int): Colors of each product, cycling through the color table, at most every color once.
+
+        Returns:
+            List: Return the ids of the inserted products.
+        """
+        color_ids = [row["id"] for row in self.backend.fetch_all(COLOR_IDS)]
+        color_count = min(color_count, len(color_ids))
+        colors = itertools.cycle(color_ids)
+        # Microsecond ids stay clear of the millisecond ids the API assigns. Seeders running at the same time
+        # interleave theirs, and a seeder never goes back below the ids it already used.
+        first_id = max(time.time_ns() // 1000, self._next_id)
+        first_id += (self.worker - first_id) % self.workers
+        product_ids = list(range(first_id, first_id + count * self.workers, self.workers))
+        self._next_id = first_id + count * self.workers
+        start = time.perf_counter()
+        for offset in range(0, count, self.batch_size):
+            batch = product_ids[offset : offset + self.batch_size]
+            products, images, variants = [], [], []
+            for product_id in batch:
+                products.append(self._product_row(product_id, len(self.product_ids) + len(products)))
+                images += [{"product_id": product_id, "image": f"seed_{i}.jpg"} for i in range(images_per_product)]
+                variants += [
+                    {"product_id": product_id, "color_id": color_id, "size": size, "stock": 10}
+                    for color_id in itertools.islice(colors, color_count)
+                    for size in sizes
+                ]
+            with self.backend.engine.begin() as connection:
+                connection.execute(INSERT_PRODUCT, products)
+                if images:
+                    connection.execute(INSERT_IMAGE, images)
+                if variants:
+                    connection.execute(INSERT_VARIANT, variants)
+            self.product_ids += batch
+        logging.info(f"Seeded {count} products as {self.tag} in {time.perf_counter() - start:.2f} s")
+        return product_ids
+
+    def purge(self) -> int:
+        """Delete every product, image and variant seeded with this run id.
+
+        Returns:
+            int: Return how many products were deleted.
+        """
+        with self.backend.engine.begin() as connection:
+            deleted = [connection.execute(statement, {"tag": self.tag}).rowcount for statement in DELETE_BY_TAG]
+        logging.info(f"Deleted {deleted[-1]} products, {deleted[1]} images and {deleted[0]} variants of {self.tag}")
+        self.product_ids = []
+        return deleted[-1]
+
+    def _product_row(self, product_id: int, index: int) -> dict:
+        return {
+            "id": product_id,
+            "category": CATEGORIES[index % len(CATEGORIES)],
+            "title": f"Seed {self.run_id} #{index}",
+            "description": "Seeded product",
+            "price": 100 + index % 900,
+            "texture": "Cotton",
+            "wash": "Hand wash",
+            "place": "Taiwan",
+            "note": self.tag,
+            "story": "Seeded for scale tests.",
+            "main_image": "seed_main.jpg",
+        }
@@ -1,18 +1,184 @@
+import asyncio
+import json
+import logging
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pprint import pprint
+from typing import Callable, Iterable, Optional
 
 import pandas as pd
-from sqlalchemy import create_engine
-from sqlalchemy.pool import NullPool
+from sqlalchemy import bindparam, create_engine, event, text
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import NoResultFound
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.sql.elements import TextClause
 
-from database.config import STYLISH_DB_URL
+from database.catalog import (
+    CATALOG_QUERIES,
+    FINGERPRINT_QUERY,
+    Catalog,
+    catalog_lock,
+    load_catalog,
+    save_catalog,
+)
+from database.config import (
+    CATALOG_CACHE_DIR,
+    STYLISH_DB_MAX_OVERFLOW,
+    STYLISH_DB_POOL_RECYCLE,
+    STYLISH_DB_POOL_SIZE,
+    STYLISH_DB_POOL_TIMEOUT,
+    STYLISH_DB_URL,
+    STYLISH_DB_WAIT_TIMEOUT,
+)
+
+# Tables and columns the local Stylish API stand-in is served from.
+SNAPSHOT_TABLES = {
+    "product": "id, category, title, description, price, texture, wash, place, note, story, main_image",
+    "product_images": "id, product_id, image",
+    "variant": "id, product_id, color_id, size, stock",
+    "color": "id, code, name",
+    "user": "id, provider, email, name, picture, access_token",
+    "order_table": "id, number, time, status, details, user_id, total",
+}
+
+# Statements with bound parameters are built once, so SQLAlchemy reuses their compiled form on every call.
+ACCESS_TOKEN_BY_EMAIL = text(
+    """
+    SELECT access_token
+      FROM user
+     WHERE email = :email;
+    """
+)
+USER_DATA_BY_EMAIL = text(
+    """
+    SELECT id,
+           provider,
+           email,
+           name,
+           picture
+      FROM user
+     WHERE email = :email;
+    """
+)
+PRODUCT_DETAIL_BY_ID = text(
+    """
+    SELECT product.id, category, title, description, price, texture, wash, place, note, story, main_image,
+           product_images.id AS image_id, image,
+           variant.id AS variant_id, size, stock,
+           color.id AS color_id, code, color.name
+      FROM product
+           INNER JOIN product_images
+           ON product_images.product_id = product.id
+           INNER JOIN variant
+           ON variant.product_id = product.id
+           INNER JOIN color
+           ON color.id = variant.color_id
+     WHERE product.id = :product_id;
+    """
+)
+ORDER_DETAILS_BY_NUMBERS = text(
+    """
+    SELECT id, number, time, status, details, user_id, total
+      FROM order_table
+     WHERE number IN :numbers;
+    """
+).bindparams(bindparam("numbers", expanding=True))
+CATALOG_FINGERPRINT = text(FINGERPRINT_QUERY)
+ORDER_DETAIL_BY_NUMBER = text(
+    """
+    SELECT id, number, time, status, details, user_id, total
+      FROM order_table
+     WHERE number = :number;
+    """
+)
+
+
+def wait_until(
+    probe: Callable, timeout: float = STYLISH_DB_WAIT_TIMEOUT, first_delay: float = 0.05, max_delay: float = 1.0
+):
+    """Call probe until it stops raising NoResultFound, backing off exponentially until the deadline.
+
+    Args:
+        probe (Callable): Lookup to retry, raising NoResultFound while the rows are not visible yet.
+        timeout (float): Seconds before the last NoResultFound is raised to the caller.
+        first_delay (float): Seconds to sleep after the first miss, doubled after every miss.
+        max_delay (float): Longest sleep between two calls.
+
+    Returns:
+        Return what probe returns.
+    """
+    deadline = time.monotonic() + timeout
+    delay = first_delay
+    while True:
+        try:
+            return probe()
+        except NoResultFound as e:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise
+            logging.info(f"{e}, retrying in {min(delay, remaining):.2f} s")
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, max_delay)
 
 
 class StylishBackend:
+    # Point at another database, e.g. a local stand-in, then call dispose_shared_engine.
+    url: str = STYLISH_DB_URL
+    # One pooled engine per process (= per xdist worker), shared by every StylishBackend instance.
+    _engine: Optional[Engine] = None
+    _pool_events = Counter()
+
     def __init__(self):
-        self.engine = create_engine(
-            STYLISH_DB_URL,
-            poolclass=NullPool,
-        )
+        self.engine = self.shared_engine()
+
+    @classmethod
+    def shared_engine(cls) -> Engine:
+        if cls._engine is None:
+            is_sqlite = make_url(cls.url).get_backend_name() == "sqlite"
+            logging.info(f"Creating shared DB engine with pool size {STYLISH_DB_POOL_SIZE}")
+            # Set on StylishBackend itself, so subclasses share the same engine.
+            StylishBackend._engine = create_engine(
+                cls.url,
+                poolclass=QueuePool,
+                pool_size=STYLISH_DB_POOL_SIZE,
+                max_overflow=STYLISH_DB_MAX_OVERFLOW,
+                pool_timeout=STYLISH_DB_POOL_TIMEOUT,
+                pool_recycle=STYLISH_DB_POOL_RECYCLE,
+                pool_pre_ping=True,
+                # Pooled connections move between threads, which SQLite refuses by default.
+                connect_args={"check_same_thread": False} if is_sqlite else {},
+            )
+            for name in ("connect", "checkout", "invalidate"):
+                event.listen(cls._engine, name, lambda *args, name=name: cls._pool_events.update([name]))
+        return cls._engine
+
+    @classmethod
+    def pool_stats(cls) -> dict:
+        """Get the state of the shared connection pool.
+
+        Returns:
+            Dict: Return current pool usage and how many connections were opened, checked out and invalidated.
+        """
+        if cls._engine is None:
+            return {}
+        pool = cls._engine.pool
+        return {
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+            "connections_opened": cls._pool_events["connect"],
+            "checkouts": cls._pool_events["checkout"],
+            "invalidated": cls._pool_events["invalidate"],
+        }
+
+    @classmethod
+    def dispose_shared_engine(cls) -> None:
+        AsyncStylishBackend.shutdown_executor()
+        if cls._engine is not None:
+            cls._engine.dispose()
+            StylishBackend._engine = None
 
     def get_all_product_names(self) -> pd.DataFrame:
         """Get all product names.
@@ -58,55 +224,192 @@ class StylishBackend:
         """
         return pd.read_sql_query(sql, self.engine)
 
+    def get_catalog(self) -> Catalog:
+        """Get products, images, variants and colors with one narrow query per table.
+
+        Returns:
+            Catalog: Return the product catalog.
+        """
+        # Taken before the tables, so rows added meanwhile make the fingerprint stale rather than hide them.
+        fingerprint = self.get_catalog_fingerprint()
+        with self.engine.connect() as connection:
+            tables = {name: pd.read_sql_query(sql, connection) for name, sql in CATALOG_QUERIES.items()}
+        return Catalog.build(tables, fingerprint)
+
+    def get_catalog_fingerprint(self) -> dict:
+        """Get row counts, max ids and content sums of the catalog tables.
+
+        Returns:
+            Dict: Return the result of FINGERPRINT_QUERY, with every value as int or None.
+        """
+        return {
+            key: None if value is None else int(value) for key, value in self.fetch_one(CATALOG_FINGERPRINT).items()
+        }
+
+    def get_cached_catalog(self, cache_dir: str = CATALOG_CACHE_DIR) -> Catalog:
+        """Get the catalog from the on-disk snapshot, refreshing it first if the fingerprint changed.
+
+        Only one process refreshes a stale snapshot, the others wait for the lock and then map its files.
+
+        Returns:
+            Catalog: Return the product catalog.
+        """
+        fingerprint = self.get_catalog_fingerprint()
+        catalog = load_catalog(cache_dir, fingerprint)
+        if catalog is None:
+            with catalog_lock(cache_dir):
+                catalog = load_catalog(cache_dir, fingerprint)
+                if catalog is None:
+                    logging.info(f"Refreshing catalog snapshot in {cache_dir}")
+                    catalog = self.get_catalog()
+                    save_catalog(catalog, cache_dir)
+        return catalog
+
     def get_access_token_by_email(self, email: str) -> str:
         """Get jwt Token.
 
         Returns:
             str: Return specific jwt Token registered in database.
         """
-        sql = f"""
-        SELECT access_token
-          FROM user
-         WHERE email = '{email}';
-        """
-        return pd.read_sql_query(sql, self.engine).iloc[0]["access_token"]
+        return self.fetch_scalar(ACCESS_TOKEN_BY_EMAIL, email=email)
 
     def get_user_data_by_email(self, email: str) -> dict:
-        sql = f"""
-        SELECT id,
-               provider,
-               email,
-               name,
-               picture
-          FROM user
-         WHERE email = '{email}';
-        """
-        return pd.read_sql_query(sql, self.engine).to_dict("records")[0]
+        return self.fetch_one(USER_DATA_BY_EMAIL, email=email)
 
     def get_product_detail_by_id(self, product_id) -> pd.DataFrame:
-        sql = f"""
-        SELECT product.id, category, title, description, price, texture, wash, place, note, story, main_image,
-               product_images.id AS image_id, image,
-               variant.id AS variant_id, size, stock,
-               color.id AS color_id, code, color.name
-          FROM product
-               INNER JOIN product_images
-               ON product_images.product_id = product.id
-               INNER JOIN variant
-               ON variant.product_id = product.id
-               INNER JOIN color
-               ON color.id = variant.color_id
-         WHERE product.id = {product_id};
+        return self.fetch_frame(PRODUCT_DETAIL_BY_ID, product_id=product_id)
+
+    def get_order_detail_by_number(self, number: str, timeout: float = STYLISH_DB_WAIT_TIMEOUT) -> dict:
+        """Get an order, waiting up to timeout seconds for it to become visible."""
+        return wait_until(partial(self.fetch_one, ORDER_DETAIL_BY_NUMBER, number=str(number)), timeout)
+
+    def get_order_details_by_numbers(self, numbers: Iterable, timeout: float = STYLISH_DB_WAIT_TIMEOUT) -> dict:
+        """Get many orders with one IN query per poll, waiting up to timeout seconds for all of them.
+
+        Only the orders still missing are queried again.
+
+        Returns:
+            Dict: Return {order number: order row}, in the order of numbers.
         """
-        return pd.read_sql_query(sql, self.engine)
+        numbers = [str(number) for number in numbers]
+        found = {}
+
+        def probe() -> dict:
+            missing = [number for number in numbers if number not in found]
+            if missing:
+                rows = self.fetch_all(ORDER_DETAILS_BY_NUMBERS, numbers=missing)
+                found.update((str(row["number"]), row) for row in rows)
+            if len(found) < len(numbers):
+                raise NoResultFound(f"{len(numbers) - len(found)} of {len(numbers)} orders not found")
+            return {number: found[number] for number in numbers}
+
+        return wait_until(probe, timeout)
+
+    def fetch_scalar(self, statement: TextClause, **params):
+        """Get the first column of the only row a statement returns, without building a DataFrame.
+
+        Raises:
+            NoResultFound: No row matches the parameters.
+        """
+        with self.engine.connect() as connection:
+            return connection.execute(statement, params).scalar_one()
 
-    def get_order_detail_by_number(self, number: str):
-        sql = f"""
-        SELECT id, number, time, status, details, user_id, total
-          FROM order_table
-         WHERE number = '{number}';
+    def fetch_one(self, statement: TextClause, **params) -> dict:
+        """Get the only row a statement returns as a dict, without building a DataFrame.
+
+        Raises:
+            NoResultFound: No row matches the parameters.
         """
-        return pd.read_sql_query(sql, self.engine).to_dict("records")[0]
+        with self.engine.connect() as connection:
+            return dict(connection.execute(statement, params).mappings().one())
+
+    def fetch_all(self, statement: TextClause, **params) -> list:
+        """Get every row a statement returns as dicts, without building a DataFrame."""
+        with self.engine.connect() as connection:
+            return [dict(row) for row in connection.execute(statement, params).mappings()]
+
+    def fetch_frame(self, statement: TextClause, **params) -> pd.DataFrame:
+        return pd.read_sql_query(statement, self.engine, params=params)
+
+    def export_snapshot(self, path: str) -> dict:
+        """Dump the tables in SNAPSHOT_TABLES to a JSON file.
+
+        Args:
+            path (str): Where to write the snapshot.
+
+        Returns:
+            Dict: Return the snapshot as {table: [row, ...]}.
+        """
+        snapshot = {
+            table: pd.read_sql_query(f"SELECT {columns} FROM {table};", self.engine).to_dict("records")
+            for table, columns in SNAPSHOT_TABLES.items()
+        }
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(snapshot, file, ensure_ascii=False, default=str)
+        return snapshot
+
+
+class AsyncStylishBackend:
+    """Awaitable lookups of a StylishBackend, run on a thread pool bounded by the DB pool.
+
+    Start verification reads as tasks next to the API calls and await them at assertion time:
+
+        order_detail = asyncio.create_task(db.get_order_detail_by_number(order_number))
+        ...
+        assert json.loads((await order_detail)["details"]) == order_info["order"]
+
+    Args:
+        backend (StylishBackend, optional): Backend the lookups run on, a new one on the shared engine by default.
+    """
+
+    _executor: Optional[ThreadPoolExecutor] = None
+
+    def __init__(self, backend: Optional[StylishBackend] = None):
+        self.backend = backend if backend is not None else StylishBackend()
+
+    @classmethod
+    def executor(cls) -> ThreadPoolExecutor:
+        # Sized like the connection pool so queries never hold a thread while waiting for a connection.
+        if cls._executor is None:
+            cls._executor = ThreadPoolExecutor(max_workers=STYLISH_DB_POOL_SIZE, thread_name_prefix="db")
+        return cls._executor
+
+    @classmethod
+    def shutdown_executor(cls) -> None:
+        if cls._executor is not None:
+            cls._executor.shutdown()
+            cls._executor = None
+
+    async def get_access_token_by_email(self, email: str) -> str:
+        return await self._run(self.backend.get_access_token_by_email, email)
+
+    async def get_user_data_by_email(self, email: str) -> dict:
+        return await self._run(self.backend.get_user_data_by_email, email)
+
+    async def get_product_detail_by_id(self, product_id) -> pd.DataFrame:
+        return await self._run(self.backend.get_product_detail_by_id, product_id)
+
+    async def get_order_detail_by_number(self, number: str, timeout: float = STYLISH_DB_WAIT_TIMEOUT) -> dict:
+        # Polls in a pool thread, so the event loop keeps running while the order is not visible yet.
+        return await self._run(self.backend.get_order_detail_by_number, number, timeout)
+
+    async def get_order_details_by_numbers(self, numbers: Iterable, timeout: float = STYLISH_DB_WAIT_TIMEOUT) -> dict:
+        return await self._run(self.backend.get_order_details_by_numbers, list(numbers), timeout)
+
+    async def fetch_scalar(self, statement: TextClause, **params):
+        return await self._run(self.backend.fetch_scalar, statement, **params)
+
+    async def fetch_one(self, statement: TextClause, **params) -> dict:
+        return await self._run(self.backend.fetch_one, statement, **params)
+
+    async def fetch_all(self, statement: TextClause, **params) -> list:
+        return await self._run(self.backend.fetch_all, statement, **params)
+
+    async def fetch_frame(self, statement: TextClause, **params) -> pd.DataFrame:
+        return await self._run(self.backend.fetch_frame, statement, **params)
+
+    async def _run(self, function: Callable, *args, **kwargs):
+        return await asyncio.get_running_loop().run_in_executor(self.executor(), partial(function, *args, **kwargs))
 
 
 def _main():
@@ -0,0 +1,463 @@
+import argparse
+import hashlib
+import json
+import logging
+import secrets
+import threading
+import time
+from collections import defaultdict
+from email import policy
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional
+from urllib.parse import parse_qs, urlsplit
+
+from sqlalchemy import create_engine, text
+
+PAGE_SIZE = 6
+CATEGORIES = ("women", "men", "accessories")
+SIZES = ("S", "M", "L", "XL", "F")
+# Required text fields of POST /admin/product with their error label and max length.
+PRODUCT_TEXT_FIELDS = {
+    "title": ("Title", 255),
+    "description": ("Description", 255),
+    "price": ("Price", None),
+    "texture": ("Texture", 127),
+    "wash": ("Wash", 127),
+    "place": ("Place of Production", 127),
+    "note": ("Note", 127),
+}
+ORDER_FIELDS = {
+    "shipping": "Shipping Method is required.",
+    "payment": "Payment Method is required.",
+    "subtotal": "Subtotal is incorrect",
+    "freight": "Freight is required.",
+    "total": "Total is incorrect",
+    "recipient": "Recipient is required.",
+    "list": "Order List is required.",
+}
+RECIPIENT_FIELDS = {
+    "name": "Receiver Name is required.",
+    "phone": "Mobile is required.",
+    "email": "Email is required.",
+    "address": "Address is required.",
+    "time": "Deliver Time is required.",
+}
+
+
+class ApiError(Exception):
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def load_snapshot(path) -> dict:
+    """Load a snapshot written by ``StylishBackend.export_snapshot``."""
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def parse_multipart(content_type: str, body: bytes) -> tuple:
+    """Split a multipart/form-data body into ({name: [values]}, {name: [(filename, bytes)]})."""
+    message = BytesParser(policy=policy.HTTP).parsebytes(f"Content-Type: {content_type}\r\n\r\n".encode() + body)
+    fields, files = defaultdict(list), defaultdict(list)
+    for part in message.iter_parts():
+        name = part.get_param("name", header="content-disposition")
+        if part.get_filename() is None:
+            fields[name].append(part.get_payload(decode=True).decode("utf-8"))
+        else:
+            files[name].append((part.get_filename(), part.get_payload(decode=True)))
+    return fields, files
+
+
+class SnapshotStore:
+    """In-memory copy of the Stylish tables, written to by orders, logins and product admin calls.
+
+    Args:
+        snapshot (dict): Rows per table, as written by StylishBackend.export_snapshot.
+        db_url (str, optional): Database seeded from the same snapshot, every write is mirrored to it so
+            StylishBackend sees what the API did.
+    """
+
+    def __init__(self, snapshot: dict, db_url: Optional[str] = None) -> None:
+        self.lock = threading.Lock()
+        self.engine = create_engine(db_url) if db_url is not None else None
+        self.products = {row["id"]: dict(row) for row in snapshot.get("product", [])}
+        self.colors = {row["id"]: dict(row) for row in snapshot.get("color", [])}
+        self.users = [dict(row) for row in snapshot.get("user", [])]
+        self.orders = {str(row["number"]): dict(row) for row in snapshot.get("order_table", [])}
+        self.images = defaultdict(list)
+        for row in snapshot.get("product_images", []):
+            self.images[row["product_id"]].append(dict(row))
+        self.variants = defaultdict(list)
+        for row in snapshot.get("variant", []):
+            self.variants[row["product_id"]].append(dict(row))
+
+    def colored_variants(self, product_id: int) -> list:
+        # Variants of an unknown color are dropped like by the INNER JOIN on color of the catalog queries.
+        return [row for row in self.variants.get(product_id, []) if row["color_id"] in self.colors]
+
+    def is_listed(self, product: dict) -> bool:
+        """Whether product lists show the product, only if it has an image and a colored variant like in Catalog."""
+        return bool(self.images.get(product["id"])) and bool(self.colored_variants(product["id"]))
+
+    def find_user(self, **conditions) -> Optional[dict]:
+        return next((user for user in self.users if all(user.get(k) == v for k, v in conditions.items())), None)
+
+    def set_access_token(self, user: dict, token: str) -> None:
+        with self.lock:
+            user["access_token"] = token
+            self._mirror(("UPDATE user SET access_token = :access_token WHERE id = :id;", user))
+
+    def insert_order(self, order: dict) -> None:
+        with self.lock:
+            order["id"] = max((row["id"] for row in self.orders.values()), default=0) + 1
+            self.orders[order["number"]] = order
+            self._mirror(
+                (
+                    "INSERT INTO order_table (id, number, time, status, details, user_id, total) "
+                    "VALUES (:id, :number, :time, :status, :details, :user_id, :total);",
+                    order,
+                )
+            )
+
+    def insert_product(self, product: dict, images: list, variants: list) -> None:
+        with self.lock:
+            image_id = max((row["id"] for rows in self.images.values() for row in rows), default=0)
+            variant_id = max((row["id"] for rows in self.variants.values() for row in rows), default=0)
+            self.products[product["id"]] = product
+            self.images[product["id"]] = [
+                {"id": image_id + i, "product_id": product["id"], "image": image} for i, image in enumerate(images, 1)
+            ]
+            self.variants[product["id"]] = [
+                {"id": variant_id + i, "product_id": product["id"], **variant} for i, variant in enumerate(variants, 1)
+            ]
+            self._mirror(
+                (
+                    "INSERT INTO product (id, category, title, description, price, texture, wash, place, note, story, "
+                    "main_image) VALUES (:id, :category, :title, :description, :price, :texture, :wash, :place, "
+                    ":note, :story, :main_image);",
+                    product,
+                ),
+                (
+                    "INSERT INTO product_images (id, product_id, image) VALUES (:id, :product_id, :image);",
+                    self.images[product["id"]],
+                ),
+                (
+                    "INSERT INTO variant (id, product_id, color_id, size, stock) "
+                    "VALUES (:id, :product_id, :color_id, :size, :stock);",
+                    self.variants[product["id"]],
+                ),
+            )
+
+    def delete_product(self, product_id) -> bool:
+        with self.lock:
+            self.images.pop(product_id, None)
+            self.variants.pop(product_id, None)
+            self._mirror(
+                ("DELETE FROM variant WHERE product_id = :id;", {"id": product_id}),
+                ("DELETE FROM product_images WHERE product_id = :id;", {"id": product_id}),
+                ("DELETE FROM product WHERE id = :id;", {"id": product_id}),
+            )
+            return self.products.pop(product_id, None) is not None
+
+    def _mirror(self, *statements) -> None:
+        if self.engine is None:
+            return
+        with self.engine.begin() as connection:
+            for sql, params in statements:
+                if params:
+                    connection.execute(text(sql), params)
+
+
+class StylishLocalServer:
+    """Localhost stand-in for the Stylish API, served from a table snapshot.
+
+    Implements /user/login|logout|profile, /products/{category}|search|details, /order and
+    /admin/product with the status codes and error messages the API suites expect.
+
+    Usage:
+        with StylishLocalServer(load_snapshot("snapshot.json")) as server:
+            RequestUtil.host = server.url
+    """
+
+    def __init__(
+        self,
+        snapshot: dict,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        accounts: Optional[dict] = None,
+        db_url: Optional[str] = None,
+    ):
+        self.store = SnapshotStore(snapshot, db_url)
+        # email -> password; without it any password of a known native user is accepted.
+        self.accounts = accounts
+        self.httpd = ThreadingHTTPServer((host, port), _StylishHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.stylish = self
+        self.url = f"http://{host}:{self.httpd.server_port}"
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "StylishLocalServer":
+        logging.info(f"Starting local Stylish API at {self.url}")
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="stylish-local-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+        if self.store.engine is not None:
+            self.store.engine.dispose()
+
+    def __enter__(self) -> "StylishLocalServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def product_payload(self, product: dict) -> dict:
+        variants = self.store.colored_variants(product["id"])
+        colors = {}
+        for variant in variants:
+            color = self.store.colors[variant["color_id"]]
+            colors.setdefault(color["code"], {"code": color["code"], "name": color["name"]})
+        return {
+            **product,
+            "main_image": f"{self.url}/assets/{product['id']}/{product['main_image']}",
+            "images": [f"{self.url}/assets/{product['id']}/{row['image']}" for row in self.store.images[product["id"]]],
+            "variants": [
+                {"color_code": self.store.colors[row["color_id"]]["code"], "size": row["size"], "stock": row["stock"]}
+                for row in variants
+            ],
+            "colors": list(colors.values()),
+            "sizes": list(dict.fromkeys(row["size"] for row in variants)),
+        }
+
+    def list_products(self, products: list, query: dict) -> dict:
+        page = query.get("paging", ["0"])[0]
+        if not page.isdigit():
+            raise ApiError(400, "Invalid paging")
+        products = [product for product in products if self.store.is_listed(product)]
+        start = int(page) * PAGE_SIZE
+        body = {"data": [self.product_payload(product) for product in products[start : start + PAGE_SIZE]]}
+        if start + PAGE_SIZE < len(products):
+            body["next_paging"] = int(page) + 1
+        return body
+
+    def login(self, body: dict) -> dict:
+        if body.get("provider") != "native" or not body.get("email") or not body.get("password"):
+            raise ApiError(400, "Email, password and provider are required.")
+        user = self.store.find_user(email=body["email"], provider="native")
+        if user is None or (self.accounts is not None and self.accounts.get(body["email"]) != body["password"]):
+            raise ApiError(403, "Login Failed")
+        token = secrets.token_hex(32)
+        self.store.set_access_token(user, token)
+        return {
+            "data": {
+                "access_token": token,
+                "access_expired": 3600,
+                "login_at": int(time.time() * 1000),
+                "user": {key: user[key] for key in ("id", "provider", "name", "email", "picture")},
+            }
+        }
+
+    def authorize(self, authorization: Optional[str]) -> dict:
+        if not authorization:
+            raise ApiError(401, "Unauthorized")
+        token = authorization.removeprefix("Bearer ").strip()
+        user = self.store.find_user(access_token=token) if token else None
+        if user is None:
+            raise ApiError(403, "Forbidden")
+        return user
+
+    def make_order(self, user: dict, body: dict) -> dict:
+        if not body.get("prime"):
+            raise ApiError(400, "Prime value is required.")
+        order = body.get("order") or {}
+        for field, message in ORDER_FIELDS.items():
+            if order.get(field) in (None, "", []):
+                raise ApiError(400, message)
+        for field, message in RECIPIENT_FIELDS.items():
+            if order["recipient"].get(field) in (None, ""):
+                raise ApiError(400, message)
+        if order["subtotal"] != sum(item["price"] * item["qty"] for item in order["list"]):
+            raise ApiError(400, ORDER_FIELDS["subtotal"])
+        if order["total"] != order["subtotal"] + order["freight"]:
+            raise ApiError(400, ORDER_FIELDS["total"])
+        number = f"{int(time.time() * 1000) % 10**8}{secrets.randbelow(10**4):04d}"
+        self.store.insert_order(
+            {
+                "number": number,
+                "time": int(time.time() * 1000),
+                "status": 0,
+                "details": json.dumps(order, ensure_ascii=False),
+                "user_id": user["id"],
+                "total": order["total"],
+            }
+        )
+        return {"data": {"number": number}}
+
+    def get_order(self, number: str) -> dict:
+        order = self.store.orders.get(number)
+        if order is None:
+            raise ApiError(400, "Order Not Found.")
+        return {"data": {**order, "details": json.loads(order["details"])}}
+
+    def create_product(self, fields: dict, files: dict) -> dict:
+        def value(name):
+            return fields.get(name, [""])[0]
+
+        if value("category") == "":
+            raise ApiError(400, "Category is required.")
+        if value("category") not in CATEGORIES:
+            raise ApiError(400, "Category should be 'men', 'women' or 'accessories' Only")
+        for name, (label, max_length) in PRODUCT_TEXT_FIELDS.items():
+            if value(name) == "":
+                raise ApiError(400, f"{label} is required.")
+            if max_length is not None and len(value(name)) > max_length:
+                raise ApiError(400, f"{name} cannot more than {max_length} characters.")
+        if not value("price").isdigit():
+            raise ApiError(400, "Price should be postive number.")
+        color_ids = [color_id for color_id in fields.get("color_ids", []) if color_id != ""]
+        sizes = [size for size in fields.get("sizes", []) if size != ""]
+        if not color_ids:
+            raise ApiError(400, "Colors is required.")
+        if not sizes:
+            raise ApiError(400, "Sizes is required.")
+        if value("story") == "":
+            raise ApiError(400, "Story is required.")
+        if not files.get("main_image"):
+            raise ApiError(400, "Main Image is required.")
+        if not files.get("other_images"):
+            raise ApiError(400, "Other Images is required.")
+        if any(not color_id.isdigit() or int(color_id) not in self.store.colors for color_id in color_ids):
+            raise ApiError(400, f"Color ID should be '{min(self.store.colors)}-{max(self.store.colors)}' Only")
+        if any(size not in SIZES for size in sizes):
+            raise ApiError(400, "Size should be 'S', 'M', 'L', 'XL', 'F' Only")
+        product_id = int(time.time() * 1000)
+        product = {name: value(name) for name in ("category", "title", "description", "texture", "wash", "place")}
+        product.update(
+            id=product_id,
+            price=int(value("price")),
+            note=value("note"),
+            story=value("story"),
+            main_image=files["main_image"][0][0],
+        )
+        variants = [{"color_id": int(color_id), "size": size, "stock": 10} for color_id in color_ids for size in sizes]
+        self.store.insert_product(product, [filename for filename, _ in files["other_images"]], variants)
+        return {"data": {"product_id": product_id}}
+
+    def delete_product(self, product_id: str) -> dict:
+        if not product_id.isdigit() or not self.store.delete_product(int(product_id)):
+            raise ApiError(400, "Product ID not found.")
+        return {"data": {"product_id": int(product_id)}}
+
+
+class _StylishHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out as separate writes on a kept-alive connection, without TCP_NODELAY every
+    # response after the first waits ~40 ms on the client's delayed ACK.
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+    def log_message(self, format, *args):
+        logging.debug(f"Local Stylish API: {format % args}")
+
+    def _dispatch(self, method: str) -> None:
+        stylish: StylishLocalServer = self.server.stylish
+        parts = urlsplit(self.path)
+        path = parts.path.removeprefix("/api/1.0").rstrip("/")
+        query = parse_qs(parts.query, keep_blank_values=True)
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        try:
+            self._send_json(200, self._route(stylish, method, path, query, body), etag=method == "GET")
+        except ApiError as e:
+            self._send_json(e.status, {"errorMsg": e.message})
+        except (ValueError, KeyError, TypeError) as e:
+            self._send_json(500, {"errorMsg": f"Internal Server Error: {e}"})
+
+    def _route(self, stylish: StylishLocalServer, method: str, path: str, query: dict, body: bytes) -> dict:
+        match method, path.split("/")[1:]:
+            case "POST", ["user", "login"]:
+                return stylish.login(json.loads(body or b"{}"))
+            case "POST", ["user", "logout"]:
+                stylish.store.set_access_token(stylish.authorize(self.headers.get("authorization")), "")
+                return {"data": {"message": "Logout Success"}}
+            case "GET", ["user", "profile"]:
+                user = stylish.authorize(self.headers.get("authorization"))
+                return {"data": {key: user[key] for key in ("provider", "name", "email", "picture")}}
+            case "GET", ["products", "search"]:
+                if "keyword" not in query:
+                    raise ApiError(400, "Search Keyword is required.")
+                keyword = query["keyword"][0]
+                return stylish.list_products(
+                    [product for product in stylish.store.products.values() if keyword in product["title"]], query
+                )
+            case "GET", ["products", "details"]:
+                product_id = query.get("id", [""])[0]
+                if not product_id.isdigit() or int(product_id) not in stylish.store.products:
+                    raise ApiError(400, "Invalid Product ID")
+                return {"data": stylish.product_payload(stylish.store.products[int(product_id)])}
+            case "GET", ["products", category]:
+                if category not in ("all", *CATEGORIES):
+                    raise ApiError(400, "Invalid Category")
+                products = [
+                    product
+                    for product in stylish.store.products.values()
+                    if category == "all" or product["category"] == category
+                ]
+                return stylish.list_products(products, query)
+            case "POST", ["order"]:
+                user = stylish.authorize(self.headers.get("authorization"))
+                return stylish.make_order(user, json.loads(body or b"{}"))
+            case "GET", ["order", number]:
+                stylish.authorize(self.headers.get("authorization"))
+                return stylish.get_order(number)
+            case "POST", ["admin", "product"]:
+                stylish.authorize(self.headers.get("authorization"))
+                return stylish.create_product(*parse_multipart(self.headers.get("Content-Type", ""), body))
+            case "DELETE", ["admin", "product", product_id]:
+                stylish.authorize(self.headers.get("authorization"))
+                return stylish.delete_product(product_id)
+        raise ApiError(404, "Not Found")
+
+    def _send_json(self, status: int, body: dict, etag: bool = False) -> None:
+        payload = json.dumps(body, ensure_ascii=False, default=str).encode("utf-8")
+        tag = f'"{hashlib.md5(payload).hexdigest()}"' if etag and status == 200 else None
+        if tag is not None and self.headers.get("If-None-Match") == tag:
+            status, payload = 304, b""
+        self.send_response(status)
+        if tag is not None:
+            self.send_header("ETag", tag)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+def _main():
+    parser = argparse.ArgumentParser(description="Serve the Stylish API locally from a table snapshot.")
+    parser.add_argument("snapshot", help="JSON snapshot written by StylishBackend.export_snapshot")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--db-url", help="Database seeded from the same snapshot to mirror writes to")
+    args = parser.parse_args()
+    server = StylishLocalServer(load_snapshot(args.snapshot), args.host, args.port, db_url=args.db_url)
+    print(f"Serving Stylish API at {server.url}")
+    server.httpd.serve_forever()
+
+
+if __name__ == "__main__":
+    _main()
@@ -0,0 +1,123 @@
+from itertools import combinations
+from typing import Iterator, NamedTuple
+
+from test_data.get_data_from_excel import Chars
+
+WIDE_CHAR = "😀"
+
+
+class Field(NamedTuple):
+    """Length constraint of one text field, path is the key sequence into the payload."""
+
+    path: tuple
+    max_length: int | None
+    chars: Chars = Chars("測")
+    min_length: int = 1
+    required: bool = True
+    wide: bool = True
+
+    @property
+    def name(self):
+        return self.path[-1]
+
+    def variants(self) -> Iterator[tuple]:
+        """Boundary values of the field, generated on demand.
+
+        Returns:
+            Iterator: Return (label, value, valid) for empty, min, max, max+1 and a max-length value of
+                4-byte characters, whose valid is None since only a utf8mb4 column can store it
+        """
+        yield "empty", "", not self.required
+        yield "min", self.chars.fill(self.min_length), True
+        if self.max_length is not None:
+            yield "max", self.chars.fill(self.max_length), True
+            yield "max+1", self.chars.fill(self.max_length + 1), False
+            if self.wide:
+                yield "wide", self.chars._replace(unit=WIDE_CHAR).fill(self.max_length), None
+
+
+class BoundaryCase(NamedTuple):
+    id: str
+    payload: dict
+    valid: bool | None
+
+
+def both_valid(valid: bool | None, other_valid: bool | None):
+    """Any invalid value makes the payload invalid, otherwise any value of unknown validity makes it unknown."""
+    if valid is False or other_valid is False:
+        return False
+    return None if valid is None or other_valid is None else True
+
+
+# Limits from the "cannot more than" alerts of the Create Product and Checkout sheets
+PRODUCT_FIELDS = (
+    Field(("title",), 255),
+    Field(("description",), 255),
+    Field(("texture",), 127),
+    Field(("wash",), 127),
+    Field(("place",), 127),
+    Field(("note",), 127),
+    Field(("story",), None),
+)
+PRODUCT_PAYLOAD = {
+    "category": "women",
+    "title": "連衣裙",
+    "description": "詳細內容",
+    "price": "100",
+    "texture": "棉",
+    "wash": "手洗",
+    "place": "Taiwan",
+    "note": "Notes",
+    "story": "Story Content",
+    "color_ids": ["2", "3"],
+    "sizes": ["L", "XL"],
+}
+ORDER_FIELDS = (
+    Field(("order", "recipient", "name"), 100),
+    Field(
+        ("order", "recipient", "email"),
+        50,
+        chars=Chars("a", prefix="abc@", suffix=".com"),
+        min_length=9,
+        wide=False,
+    ),
+    Field(("order", "recipient", "address"), 255),
+)
+
+
+def with_value(payload: dict, path: tuple, value):
+    """Copy only the dicts along path, so every case shares the rest of the base payload."""
+    key, *rest = path
+    return {**payload, key: with_value(payload[key], rest, value) if rest else value}
+
+
+def boundary_cases(fields: tuple, base: dict, pairwise: bool = True) -> Iterator[BoundaryCase]:
+    """Stream payloads that vary one field at a time, then every pair of variants of every pair of fields.
+
+    Nothing is materialized, so the result can be sliced with itertools.islice, fed to a load loop or
+    passed to pytest.mark.parametrize with ids=lambda case: case.id.
+
+    Returns:
+        Iterator: Return BoundaryCase whose valid is True only if every varied value is valid, None if unknown
+    """
+    for field in fields:
+        for label, value, valid in field.variants():
+            yield BoundaryCase(f"{field.name}={label}", with_value(base, field.path, value), valid)
+    if pairwise:
+        for first, second in combinations(fields, 2):
+            for label, value, valid in first.variants():
+                payload = with_value(base, first.path, value)
+                for other_label, other_value, other_valid in second.variants():
+                    yield BoundaryCase(
+                        f"{first.name}={label},{second.name}={other_label}",
+                        with_value(payload, second.path, other_value),
+                        both_valid(valid, other_valid),
+                    )
+
+
+def product_cases(base: dict = PRODUCT_PAYLOAD, pairwise: bool = True) -> Iterator[BoundaryCase]:
+    return boundary_cases(PRODUCT_FIELDS, base, pairwise)
+
+
+def order_cases(order_info: dict, pairwise: bool = True) -> Iterator[BoundaryCase]:
+    return boundary_cases(ORDER_FIELDS, order_info, pairwise)
@@ -1,83 +1,234 @@
+import functools
+import hashlib
+import logging
+import os
+import time
+import uuid
 from pathlib import Path
 from pprint import pprint
+from typing import NamedTuple
 
 import pandas as pd
 
+from test_data.image_corpus import ImageSpec, build_image, is_synthetic_image
+
+WORKBOOK = Path(__file__).parent / "Stylish-Test Case.xlsx"
+CACHE_DIR = Path(__file__).parent / ".cache"
+
+ALL_COLUMNS = "*"
+
+
+class Chars(NamedTuple):
+    """Expansion of an "N chars" placeholder into exactly N characters: prefix + unit * k + suffix."""
+
+    unit: str
+    prefix: str = ""
+    suffix: str = ""
+
+    def expand(self, placeholder: str):
+        return self.fill(int(placeholder.split()[0]))
+
+    def fill(self, length: int):
+        count, remainder = divmod(length - len(self.prefix) - len(self.suffix), len(self.unit))
+        if count < 0 or remainder:
+            raise ValueError(f"{self} cannot fill {length} chars")
+        return self.prefix + self.unit * count + self.suffix
+
+
+ONE_CHAR = {"1 chars": "I"}
+SAMPLE_IMAGES = {
+    "Main Image": {"sample image": "mainImage.jpg"},
+    "Other Image 1": {"sample image": "otherImage0.jpg"},
+    "Other Image 2": {"sample image": "otherImage1.jpg"},
+}
+# Sheet -> column (or ALL_COLUMNS) -> placeholder -> literal value or Chars rule
+PLACEHOLDER_RULES = {
+    "Checkout with Invalid Value": {
+        "Receiver": {"101 chars": Chars("陳")},
+        "Email": {"51 chars": Chars("a", prefix="abc@", suffix=".com")},
+        "Address": {"256 chars": Chars("台")},
+    },
+    "Create Product Failed": {
+        "Title": {"256 chars": Chars("裙")},
+        "Description": {"256 chars": Chars("詳細內容")},
+        "Texture": {"128 chars": Chars("棉")},
+        "Wash": {"128 chars": Chars("手洗")},
+        "Place of Product": {"128 chars": Chars("TW")},
+        "Note": {"128 chars": Chars("Note")},
+        **SAMPLE_IMAGES,
+    },
+    "Create Product Success": {
+        "Title": {"連身裙": "Mingchun_連身裙", **ONE_CHAR, "255 chars": Chars("裙", prefix="Mingchun_")},
+        "Description": {**ONE_CHAR, "255 chars": Chars("連")},
+        "Texture": {**ONE_CHAR, "127 chars": Chars("棉")},
+        "Wash": {**ONE_CHAR, "127 chars": Chars("洗")},
+        "Place of Product": {**ONE_CHAR, "127 chars": Chars("台")},
+        "Note": {**ONE_CHAR, "127 chars": Chars("筆")},
+        "Story": ONE_CHAR,
+        **SAMPLE_IMAGES,
+    },
+    "API Create Product Success": {
+        "Title": {"連身裙": "Mingchun_連身裙"},
+        **SAMPLE_IMAGES,
+        ALL_COLUMNS: {
+            **ONE_CHAR,
+            "255 chars": Chars("褲", prefix="Mingchun_"),
+            "127 chars": Chars("裙", prefix="Mingchun_"),
+        },
+    },
+    "API Create Product Failed": {
+        **SAMPLE_IMAGES,
+        ALL_COLUMNS: {"256 chars": Chars("褲", prefix="Mingchun_"), "128 chars": Chars("裙", prefix="Mingchun_")},
+    },
+}
+
+_sheets: dict[str, pd.DataFrame] = {}
+_records: dict[str, tuple] = {}
+load_timings: dict[str, float] = {}
+
+
+class FrozenRecord(dict):
+    """A test-data row shared by every parametrized test; copy() it to get an editable dict."""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError(f"{type(self).__name__} is read-only, use copy() to modify it")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self):
+        return type(self), (dict(self),)
+
+
+@functools.lru_cache(maxsize=None)
+def workbook_digest(path: Path = WORKBOOK):
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def rules_digest():
+    return hashlib.sha256(repr(PLACEHOLDER_RULES).encode()).hexdigest()[:16]
+
+
+def compiled_dir(path: Path = WORKBOOK, cache_dir: Path = CACHE_DIR):
+    # Pickles are only readable by the pandas that wrote them, so its version is part of the key.
+    return cache_dir / f"{workbook_digest(path)}-{rules_digest()}-pandas{pd.__version__}"
+
+
+def expand_placeholders(sheet: str, df: pd.DataFrame):
+    """Replace every placeholder of the sheet's rules in one nested-dict DataFrame.replace call.
+
+    Returns:
+        DataFrame: Return the expanded sheet
+    """
+    rules = PLACEHOLDER_RULES.get(sheet, {})
+    replacements = {}
+    for column in df.columns:
+        mapping = {**rules.get(ALL_COLUMNS, {}), **rules.get(column, {})}
+        if mapping:
+            replacements[column] = {
+                placeholder: value.expand(placeholder) if isinstance(value, Chars) else value
+                for placeholder, value in mapping.items()
+            }
+    return df.replace(replacements) if replacements else df
+
+
+def compile_workbook(path: Path = WORKBOOK, cache_dir: Path = CACHE_DIR):
+    """Parse and expand every sheet of the workbook once and pickle it under the workbook and rules hash.
+
+    Each sheet is written to a temporary file and renamed into place, so concurrent xdist workers
+    compiling the same workbook never observe a half-written cache entry.
+
+    Returns:
+        dict: Return sheet name -> DataFrame of strings with blanks as ""
+    """
+    target = compiled_dir(path, cache_dir)
+    target.mkdir(parents=True, exist_ok=True)
+    sheets = {
+        name: expand_placeholders(name, df.fillna(""))
+        for name, df in pd.read_excel(path, sheet_name=None, dtype=str).items()
+    }
+    for name, df in sheets.items():
+        temp = target / f".{uuid.uuid4().hex}.tmp"
+        df.to_pickle(temp)
+        os.replace(temp, target / f"{name}.pickle")
+    logging.info(f"Compiled {path.name} into {target}")
+    return sheets
+
+
+def load_sheet(name: str, path: Path = WORKBOOK, cache_dir: Path = CACHE_DIR):
+    """Load one sheet from the compiled cache, compiling the workbook on a miss or an unreadable entry.
+
+    The result is memoized for the life of the process and its load time is recorded in load_timings.
+
+    Returns:
+        DataFrame: Return the shared sheet, callers must not modify it in place
+    """
+    if name not in _sheets:
+        start = time.perf_counter()
+        try:
+            _sheets[name] = pd.read_pickle(compiled_dir(path, cache_dir) / f"{name}.pickle")
+        except FileNotFoundError:
+            _sheets[name] = compile_workbook(path, cache_dir)[name]
+        except Exception as e:
+            logging.warning(f"Recompiling {path.name}, cached sheet {name!r} is unreadable: {e!r}")
+            _sheets[name] = compile_workbook(path, cache_dir)[name]
+        load_timings[name] = time.perf_counter() - start
+        logging.info(f"Loaded sheet {name!r} in {load_timings[name] * 1000:.1f} ms")
+    return _sheets[name]
+
+
+def frozen_records(method):
+    @functools.wraps(method)
+    def wrapper(self):
+        if method.__name__ not in _records:
+            _records[method.__name__] = tuple(FrozenRecord(record) for record in method(self))
+        return _records[method.__name__]
+
+    return wrapper
+
 
 class GetData:
     def __init__(self):
         self.root_path = Path(__file__).parent
-        self.xls = pd.ExcelFile("/" / self.root_path / "Stylish-Test Case.xlsx")
 
+    @property
+    def load_timings(self):
+        return dict(load_timings)
+
+    def read_sheet(self, name: str):
+        return load_sheet(name)
+
+    @frozen_records
     def get_invalid_checkout_data(self):
-        df = pd.read_excel(self.xls, "Checkout with Invalid Value", dtype=str).fillna("")
-        df["Receiver"] = df["Receiver"].replace("101 chars", "陳" * 101)
-        df["Email"] = df["Email"].replace("51 chars", "abc@" + "a" * 43 + ".com")
-        df["Address"] = df["Address"].replace("256 chars", "台" * 256)
-        return df.to_dict("records")
+        return self.read_sheet("Checkout with Invalid Value").to_dict("records")
 
+    @frozen_records
     def get_valid_checkout_data(self):
-        return pd.read_excel(self.xls, "Checkout with Valid Value", dtype=str).fillna("").to_dict("records")
+        return self.read_sheet("Checkout with Valid Value").to_dict("records")
 
     def get_file_full_path(self, file_name: str):
         if file_name == "":
             return None
+        elif is_synthetic_image(file_name):
+            return build_image(ImageSpec.parse(file_name))
         else:
             return str("/" / self.root_path / file_name)
 
+    @frozen_records
     def get_invalid_product_create_info(self):
-        df = pd.read_excel(self.xls, "Create Product Failed", dtype=str).fillna("")
-        df["Title"] = df["Title"].replace("256 chars", "裙" * 256)
-        df["Description"] = df["Description"].replace("256 chars", "詳細內容" * 64)
-        df["Texture"] = df["Texture"].replace("128 chars", "棉" * 128)
-        df["Wash"] = df["Wash"].replace("128 chars", "手洗" * 64)
-        df["Place of Product"] = df["Place of Product"].replace("128 chars", "TW" * 64)
-        df["Note"] = df["Note"].replace("128 chars", "Note" * 32)
-        df["Main Image"] = df["Main Image"].replace("sample image", "mainImage.jpg")
-        df["Other Image 1"] = df["Other Image 1"].replace("sample image", "otherImage0.jpg")
-        df["Other Image 2"] = df["Other Image 2"].replace("sample image", "otherImage1.jpg")
-        return df.to_dict("records")
+        return self.read_sheet("Create Product Failed").to_dict("records")
 
+    @frozen_records
     def get_valid_product_create_info(self):
-        df = pd.read_excel(self.xls, "Create Product Success", dtype=str).fillna("")
-        df["Title"] = df["Title"].replace("連身裙", "Mingchun_連身裙")
-        df["Title"] = df["Title"].replace("1 chars", "I")
-        df["Title"] = df["Title"].replace("255 chars", "Mingchun_" + "裙" * 246)
-        df["Description"] = df["Description"].replace("1 chars", "I")
-        df["Description"] = df["Description"].replace("255 chars", "連" * 255)
-        df["Texture"] = df["Texture"].replace("1 chars", "I")
-        df["Texture"] = df["Texture"].replace("127 chars", "棉" * 127)
-        df["Wash"] = df["Wash"].replace("1 chars", "I")
-        df["Wash"] = df["Wash"].replace("127 chars", "洗" * 127)
-        df["Place of Product"] = df["Place of Product"].replace("1 chars", "I")
-        df["Place of Product"] = df["Place of Product"].replace("127 chars", "台" * 127)
-        df["Note"] = df["Note"].replace("1 chars", "I")
-        df["Note"] = df["Note"].replace("127 chars", "筆" * 127)
-        df["Story"] = df["Story"].replace("1 chars", "I")
-        df["Main Image"] = df["Main Image"].replace("sample image", "mainImage.jpg")
-        df["Other Image 1"] = df["Other Image 1"].replace("sample image", "otherImage0.jpg")
-        df["Other Image 2"] = df["Other Image 2"].replace("sample image", "otherImage1.jpg")
-        return df.to_dict("records")
+        return self.read_sheet("Create Product Success").to_dict("records")
 
+    @frozen_records
     def get_valid_api_product_create_info(self):
-        df = pd.read_excel(self.xls, "API Create Product Success", dtype=str).fillna("")
-        df["Title"].replace("連身裙", "Mingchun_連身裙", inplace=True)
-        df["Main Image"].replace("sample image", "mainImage.jpg", inplace=True)
-        df["Other Image 1"].replace("sample image", "otherImage0.jpg", inplace=True)
-        df["Other Image 2"].replace("sample image", "otherImage1.jpg", inplace=True)
-        df.replace("1 chars", "I", inplace=True)
-        df.replace("255 chars", "Mingchun_" + "褲" * 246, inplace=True)
-        df.replace("127 chars", "Mingchun_" + "裙" * 118, inplace=True)
-        return df.to_dict("records")
+        return self.read_sheet("API Create Product Success").to_dict("records")
 
+    @frozen_records
     def get_invalid_api_product_create_info(self):
-        df = pd.read_excel(self.xls, "API Create Product Failed", dtype=str).fillna("")
-        df["Main Image"].replace("sample image", "mainImage.jpg", inplace=True)
-        df["Other Image 1"].replace("sample image", "otherImage0.jpg", inplace=True)
-        df["Other Image 2"].replace("sample image", "otherImage1.jpg", inplace=True)
-        df.replace("256 chars", "Mingchun_" + "褲" * 247, inplace=True)
-        df.replace("128 chars", "Mingchun_" + "裙" * 119, inplace=True)
-        return df.to_dict("records")
+        return self.read_sheet("API Create Product Failed").to_dict("records")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,176 @@
+import logging
+import os
+import random
+import re
+import struct
+import uuid
+import zlib
+from pathlib import Path
+from typing import NamedTuple
+
+SAMPLES_DIR = Path(__file__).parent
+CORPUS_DIR = SAMPLES_DIR / ".cache" / "images"
+UNITS = {"": 1, "KB": 1024, "MB": 1024**2}
+NAME_PATTERN = re.compile(r"(\d+)x(\d+)-(\d+)(KB|MB)?\.(png|jpg)")
+CHUNK_SIZE = 1024**2
+# Largest payload of one JPEG COM segment, its 2-byte length field counts itself.
+MAX_COMMENT = 0xFFFF - 2
+
+
+class ImageSpec(NamedTuple):
+    """A synthetic image named like "1920x1080-5MB.png", the file is exactly size bytes long."""
+
+    width: int
+    height: int
+    size: int
+    extension: str
+
+    @classmethod
+    def parse(cls, name: str) -> "ImageSpec":
+        match = NAME_PATTERN.fullmatch(name)
+        if match is None:
+            raise ValueError(f"{name!r} is not a synthetic image name like 1920x1080-5MB.png")
+        width, height, size, unit, extension = match.groups()
+        return cls(int(width), int(height), int(size) * UNITS[unit or ""], extension)
+
+    @property
+    def name(self) -> str:
+        # The largest unit the size is a whole nonzero number of, so 0 and 1536 bytes stay in bytes.
+        unit = next((unit for unit in ("MB", "KB") if self.size and self.size % UNITS[unit] == 0), "")
+        return f"{self.width}x{self.height}-{self.size // UNITS[unit]}{unit}.{self.extension}"
+
+
+# PNG covers any dimensions, JPEG reuses the dimensions of the bundled samples (600x800 and 960x540).
+CORPUS = tuple(
+    ImageSpec.parse(name)
+    for name in (
+        "64x64-10KB.png",
+        "800x600-100KB.png",
+        "800x600-1MB.png",
+        "1920x1080-5MB.png",
+        "4000x3000-20MB.png",
+        "600x800-100KB.jpg",
+        "960x540-1MB.jpg",
+        "960x540-5MB.jpg",
+        "600x800-20MB.jpg",
+    )
+)
+
+
+def is_synthetic_image(name: str) -> bool:
+    return NAME_PATTERN.fullmatch(name) is not None
+
+
+def png_chunk(kind: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+
+def write_png(file, spec: ImageSpec) -> None:
+    """Write an RGB gradient, then pad the file to spec.size with a private ancillary chunk decoders skip."""
+    row_length = spec.width * 3
+    pattern = bytes(range(256)) * (row_length // 256 + 2)
+    compressor = zlib.compressobj(9)
+    pixels = [compressor.compress(b"\x00" + pattern[y % 256 : y % 256 + row_length]) for y in range(spec.height)]
+    pixels.append(compressor.flush())
+    header = b"\x89PNG\r\n\x1a\n" + png_chunk(b"IHDR", struct.pack(">IIBBBBB", spec.width, spec.height, 8, 2, 0, 0, 0))
+    data = png_chunk(b"IDAT", b"".join(pixels))
+    end = png_chunk(b"IEND", b"")
+    padding = spec.size - len(header) - len(data) - len(end) - 12
+    if padding < 0:
+        raise ValueError(f"{spec.name} needs at least {spec.size - padding} bytes")
+    file.write(header + data + struct.pack(">I", padding) + b"paDd")
+    crc = zlib.crc32(b"paDd")
+    rng = random.Random(spec.name)
+    # Random filler so neither the transport nor the server can compress the padding away.
+    while padding > 0:
+        chunk = rng.randbytes(min(padding, CHUNK_SIZE))
+        file.write(chunk)
+        crc = zlib.crc32(chunk, crc)
+        padding -= len(chunk)
+    file.write(struct.pack(">I", crc) + end)
+
+
+def jpeg_segments(data: bytes):
+    """Yield (marker, offset) of each header segment up to and including SOS, where entropy-coded data starts."""
+    position = 2
+    while position < len(data):
+        marker, length = struct.unpack(">HH", data[position : position + 4])
+        yield marker, position
+        if marker == 0xFFDA:
+            return
+        position += 2 + length
+    raise ValueError("No SOS segment found")
+
+
+def jpeg_dimensions(data: bytes) -> tuple:
+    for marker, position in jpeg_segments(data):
+        if marker in (0xFFC0, 0xFFC1, 0xFFC2):
+            height, width = struct.unpack(">HH", data[position + 5 : position + 9])
+            return width, height
+    raise ValueError("No SOF segment found")
+
+
+def write_jpeg(file, spec: ImageSpec) -> None:
+    """Copy the bundled sample of the same dimensions and pad it to spec.size with COM segments before SOS."""
+    for path in sorted(SAMPLES_DIR.glob("*.jpg")):
+        sample = path.read_bytes()
+        if jpeg_dimensions(sample) == (spec.width, spec.height):
+            break
+    else:
+        raise ValueError(f"No sample JPEG is {spec.width}x{spec.height}, use a PNG for other dimensions")
+    padding = spec.size - len(sample)
+    if padding < 0 or 0 < padding < 4:
+        raise ValueError(f"{spec.name} cannot be padded from the {len(sample)} bytes of {path.name}")
+    segments = -(-padding // (MAX_COMMENT + 4))
+    remaining = padding - 4 * segments
+    start_of_scan = next(position for marker, position in jpeg_segments(sample) if marker == 0xFFDA)
+    rng = random.Random(spec.name)
+    file.write(sample[:start_of_scan])
+    for _ in range(segments):
+        length = min(MAX_COMMENT, remaining)
+        file.write(struct.pack(">HH", 0xFFFE, length + 2) + rng.randbytes(length))
+        remaining -= length
+    file.write(sample[start_of_scan:])
+
+
+def build_image(spec: ImageSpec, corpus_dir: Path = CORPUS_DIR) -> str:
+    """Build the image on first use and reuse it afterwards, the content depends only on the spec.
+
+    Returns:
+        str: Return the full path of the image
+    """
+    path = corpus_dir / spec.name
+    if path.exists() and path.stat().st_size == spec.size:
+        return str(path)
+    corpus_dir.mkdir(parents=True, exist_ok=True)
+    temp = corpus_dir / f".{uuid.uuid4().hex}.tmp"
+    try:
+        with open(temp, "wb") as file:
+            if spec.extension == "png":
+                write_png(file, spec)
+            else:
+                write_jpeg(file, spec)
+        os.replace(temp, path)
+    finally:
+        temp.unlink(missing_ok=True)
+    logging.info(f"Built synthetic image {path}")
+    return str(path)
+
+
+def image_corpus(specs: tuple = CORPUS, corpus_dir: Path = CORPUS_DIR) -> dict:
+    """Build every missing image of the corpus.
+
+    Returns:
+        dict: Return image name -> full path
+    """
+    return {spec.name: build_image(spec, corpus_dir) for spec in specs}
+
+
+def _main():
+    # python -m test_data.image_corpus builds the corpus ahead of a test run
+    logging.basicConfig(level=logging.INFO)
+    image_corpus()
+
+
+if __name__ == "__main__":
+    _main()
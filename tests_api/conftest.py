@@ -1,18 +1,122 @@
 import json
+import logging
 import os
 
+import allure
 import pytest
 from dotenv import load_dotenv
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
 
+from api_objects.config import LATENCY_REPORT_DIR
+from api_objects.latency import clear_samples, latency_budget, latency_recorder, write_session_report
+from api_objects.request_util import RequestUtil, Transport
+from api_objects.response_cache import ResponseCache
+from database.product_index import build_product_index
+from database.seeder import StylishSeeder
 from database.stylish_backend import StylishBackend
+from local_server.stylish_server import StylishLocalServer, load_snapshot
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--latency-budget-mode",
+        action="store",
+        default="report",
+        choices=["report", "fail"],
+        help="What to do when a call in a latency_budget marked test is over budget",
+    )
+
+
+def pytest_configure(config):
+    if not hasattr(config, "workerinput"):
+        clear_samples(LATENCY_REPORT_DIR)
+
+
+def pytest_sessionfinish(session):
+    workerinput = getattr(session.config, "workerinput", None)
+    latency_recorder.dump_samples(LATENCY_REPORT_DIR, workerinput["workerid"] if workerinput else "master")
+    # The controller finishes after every worker, so it sees all sample files.
+    if workerinput is None:
+        write_session_report(LATENCY_REPORT_DIR)
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item):
+    marker = item.get_closest_marker("latency_budget")
+    if marker is None:
+        return (yield)
+    budget_ms = marker.kwargs.get("ms", marker.args[0] if marker.args else None)
+    if budget_ms is None:
+        raise pytest.UsageError(
+            f"{item.nodeid}: latency_budget needs a budget, e.g. @pytest.mark.latency_budget(ms=500)"
+        )
+    latency_budget.start(budget_ms)
+    try:
+        # A failing test raises here, its own failure is reported instead of the budget.
+        result = yield
+    finally:
+        budget = latency_budget.finish()
+        item.user_properties.append(("latency_budget", budget))
+        allure.attach(json.dumps(budget, indent=2), "Latency Budget", attachment_type=allure.attachment_type.JSON)
+    violations = budget["violations"]
+    if violations and item.config.getoption("latency_budget_mode") == "fail":
+        pytest.fail(f"{len(violations)} of {budget['calls']} calls over the {budget['budget_ms']} ms budget")
+    return result
+
+
+@pytest.fixture(scope="session", autouse=True)
+def http_transport():
+    # One pooled transport per xdist worker, handed to every API object created in this worker.
+    yield Transport.shared()
+    Transport.close_shared()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def stylish_server(request, local_database):
+    snapshot = request.config.getoption("stylish_snapshot")
+    if snapshot is None:
+        yield None
+        return
+    load_dotenv()
+    accounts = {account["email"]: account["password"] for account in json.loads(os.getenv("ACCOUNT")).values()}
+    with StylishLocalServer(load_snapshot(snapshot), accounts=accounts, db_url=local_database) as server:
+        original_host, RequestUtil.host = RequestUtil.host, server.url
+        yield server
+        RequestUtil.host = original_host
+
+
+@pytest.fixture(scope="session", autouse=True)
+def latency_report():
+    yield latency_recorder
+    allure.attach(
+        json.dumps(latency_recorder.summary(), indent=2),
+        "Latency Report",
+        attachment_type=allure.attachment_type.JSON,
+    )
+
+
+@pytest.fixture(scope="session")
+def response_cache():
+    cache = ResponseCache()
+    yield cache
+    logging.info(f"Response cache stats: {cache.stats()}")
 
 
 @pytest.fixture(scope="session")
-def database():
-    return StylishBackend()
+def seeder(request, worker_id, local_database):
+    # Products seeded by scale tests are deleted in bulk once this worker's session ends.
+    if local_database is None:
+        pytest.skip("Seeded rows would show up in the shared database other tests compare with, use --stylish-snapshot")
+    workerinput = getattr(request.config, "workerinput", {})
+    _seeder = StylishSeeder(
+        run_id=f"{worker_id}-{os.getpid()}",
+        worker=0 if worker_id == "master" else int(worker_id.removeprefix("gw")),
+        workers=workerinput.get("workercount", 1),
+    )
+    yield _seeder
+    _seeder.purge()
 
 
 @pytest.fixture(scope="session")
@@ -34,10 +138,15 @@ def db_user_data(database: StylishBackend, valid_user_account: dict) -> dict:
 
 
 @pytest.fixture(scope="session")
-def db_products():
-    df = StylishBackend().get_all_product_detail()
-    df["main_image"] = df.agg("http://54.201.140.239/assets/{0[id]}/{0[main_image]}".format, axis=1)
-    df["image"] = df.agg("http://54.201.140.239/assets/{0[id]}/{0[image]}".format, axis=1)
+def product_index(catalog):
+    return build_product_index(catalog, RequestUtil.host)
+
+
+@pytest.fixture(scope="session")
+def db_products(catalog):
+    df = catalog.product_detail()
+    df["main_image"] = df.agg((RequestUtil.host + "/assets/{0[id]}/{0[main_image]}").format, axis=1)
+    df["image"] = df.agg((RequestUtil.host + "/assets/{0[id]}/{0[image]}").format, axis=1)
     return df
 
 
@@ -1,8 +1,12 @@
+import asyncio
+
 import allure
 import pytest
 
-from api_objects.admin import AdminAPI
-from database.stylish_backend import StylishBackend
+from api_objects.admin import AdminAPI, AsyncAdminAPI
+from api_objects.token_cache import TokenCache
+from database.stylish_backend import AsyncStylishBackend, StylishBackend
+from test_data.boundary_values import BoundaryCase, product_cases
 from test_data.get_data_from_excel import GetData
 
 test_data = GetData()
@@ -11,14 +15,10 @@ invalid_api_product_create_info = test_data.get_invalid_api_product_create_info(
 
 
 @pytest.fixture
-def admin(valid_user_account: dict):
+def admin(valid_user_account: dict, token_cache: TokenCache):
     _admin = AdminAPI()
-    login_info = valid_user_account.copy()
-    login_info.update({"provider": "native"})
-    _admin.set_login_request_body(login_info)
-    assert _admin.login() == 200
+    assert token_cache.login(_admin, valid_user_account) == 200
     yield _admin
-    _admin.close_opened_images()
     if _admin.created_product_id is not None:
         _admin.delete_product_by_id(_admin.created_product_id)
 
@@ -29,10 +29,10 @@ def admin(valid_user_account: dict):
 @pytest.mark.parametrize("product_info", valid_api_product_create_info)
 def test_create_and_delete_product_with_valid_input(admin: AdminAPI, product_info):
     payload = admin.generate_product_payload(product_info)
-    image_files = admin.generate_product_image_files(product_info)
 
     with allure.step("Create product with valid product info"):
-        response = admin.create_product(payload, image_files)
+        with admin.generate_product_image_files(product_info) as image_files:
+            response = admin.create_product(payload, image_files)
         admin.created_product_id = response.json().get("data", {}).get("product_id", None)
         assert response.status_code == 200
 
@@ -53,10 +53,17 @@ def test_create_and_delete_product_with_valid_input(admin: AdminAPI, product_inf
         assert db_product_detail == payload
         assert db_images == [image[1].name.split("/")[-1] for image in image_files]
 
+    async def delete_product(product_id):
+        # Same user as the admin fixture, the calls are logged on the event loop thread inside the step.
+        async_admin = AsyncAdminAPI()
+        async_admin.headers.update(admin.headers)
+        response = await async_admin.delete_product_by_id(product_id)
+        return response, await AsyncStylishBackend().get_product_detail_by_id(product_id)
+
     with allure.step("Delete product by product id which just created"):
-        response = admin.delete_product_by_id(admin.created_product_id)
+        response, product_detail = asyncio.run(delete_product(admin.created_product_id))
         assert response.status_code == 200
-        assert StylishBackend().get_product_detail_by_id(admin.created_product_id).empty
+        assert product_detail.empty
 
     with allure.step("Delete product again"):
         response = admin.delete_product_by_id(admin.created_product_id)
@@ -72,12 +79,28 @@ def test_create_and_delete_product_with_valid_input(admin: AdminAPI, product_inf
 @pytest.mark.parametrize("product_info", invalid_api_product_create_info)
 def test_create_product_with_invalid_input(admin: AdminAPI, product_info):
     payload = admin.generate_product_payload(product_info)
-    image_files = admin.generate_product_image_files(product_info)
 
     with allure.step("Create product with invalid product info"):
-        response = admin.create_product(payload, image_files)
+        with admin.generate_product_image_files(product_info) as image_files:
+            response = admin.create_product(payload, image_files)
         admin.created_product_id = response.json().get("data", {}).get("created_product_id", None)
         assert response.status_code == 400
 
     with allure.step(f'Assert if error message is "{product_info["Error Msg"]}"'):
         assert response.json()["errorMsg"] == product_info["Error Msg"]
+
+
+@allure.feature("Admin APIs")
+@allure.story("POST /admin/product")
+@allure.title("[Boundary] Length of product text fields")
+@pytest.mark.parametrize("case", list(product_cases(pairwise=False)), ids=lambda case: case.id)
+def test_create_product_with_boundary_values(admin: AdminAPI, case: BoundaryCase):
+    with allure.step(f"Create product with {case.id}"):
+        with admin.generate_product_image_files(valid_api_product_create_info[0]) as image_files:
+            response = admin.create_product(case.payload, image_files)
+        admin.created_product_id = response.json().get("data", {}).get("product_id", None)
+
+    # Storing 4-byte characters depends on the column charset, so a value of unknown validity may go either way.
+    expected = {True: (200,), False: (400,), None: (200, 400)}[case.valid]
+    with allure.step(f"Assert if the status code is one of {expected}"):
+        assert response.status_code in expected
@@ -0,0 +1,231 @@
+import hashlib
+import json
+
+import allure
+import pytest
+
+from api_objects.latency import LatencyBudget, Sample, normalize_route, percentile, write_session_report
+from api_objects.products import ProductsAPI
+from api_objects.request_util import RequestUtil
+from api_objects.response_cache import ResponseCache
+from api_objects.token_cache import TokenCache
+from api_objects.uploads import MappedFile, MultipartStream
+from api_objects.user import UserAPI
+from local_server.stylish_server import StylishLocalServer, parse_multipart
+from test_data.get_data_from_excel import GetData
+
+
+@allure.feature("API helpers")
+@allure.story("ResponseCache")
+@allure.title("Serve fresh entries from cache and revalidate stale ones with ETag")
+def test_response_cache_revalidates_stale_entry():
+    cache = ResponseCache(default_ttl=0)
+    product = ProductsAPI()
+    url = f"{product.base_url}all"
+    with allure.step("First GET is a miss"):
+        response, headers = cache.lookup(url)
+        assert response is None and headers == {}
+        first = cache.store(url, product.get(url))
+        assert first.status_code == 200
+    with allure.step("Expired entry is revalidated and the cached response is reused on 304"):
+        response, headers = cache.lookup(url)
+        assert response is None and "If-None-Match" in headers
+        revalidated = product.get(url, headers=headers)
+        assert revalidated.status_code == 304
+        assert cache.store(url, revalidated) is first
+        assert cache.stats() == {"entries": 1, "hits": 0, "misses": 1, "revalidations": 1}
+    with allure.step("Fresh entry is served without a request"):
+        cache.default_ttl = 60
+        fresh = cache.store(url, product.get(url))
+        assert cache.lookup(url) == (fresh, None)
+
+
+@allure.feature("API helpers")
+@allure.story("ResponseCache")
+@allure.title("Refetch when the entry is evicted while revalidating")
+def test_cached_get_refetches_after_eviction(monkeypatch):
+    cache = ResponseCache(default_ttl=0)
+    monkeypatch.setattr(ProductsAPI, "cache", cache)
+    product = ProductsAPI()
+    expected = product.get_products_by_category("all").json()
+    lookup = cache.lookup
+
+    def lookup_then_evict(url):
+        result = lookup(url)
+        cache.clear()
+        return result
+
+    monkeypatch.setattr(cache, "lookup", lookup_then_evict)
+    response = product.get_products_by_category("all")
+    assert response.status_code == 200
+    assert response.json() == expected
+
+
+@allure.feature("API helpers")
+@allure.story("ProductPaginator")
+@allure.title("Reject a concurrency below 1")
+@pytest.mark.parametrize("concurrency", [0, -1])
+def test_paginator_rejects_non_positive_concurrency(concurrency):
+    with pytest.raises(ValueError):
+        ProductsAPI().paginate_products_by_category("all", concurrency)
+
+
+@allure.feature("API helpers")
+@allure.story("TokenCache")
+@allure.title("Reuse a cached token that is still valid")
+def test_token_cache_reuses_valid_token(valid_user_account: dict, tmp_path):
+    path = tmp_path / "tokens.json"
+    with allure.step("First login stores the token"):
+        first = UserAPI()
+        assert TokenCache(str(path)).login(first, valid_user_account) == 200
+    with allure.step("A new cache loaded from the file reuses it"):
+        second = UserAPI()
+        assert TokenCache(str(path)).login(second, valid_user_account) == 200
+        assert second.get_access_token() == first.get_access_token()
+        assert second.get_profile()[0] == 200
+
+
+@allure.feature("API helpers")
+@allure.story("TokenCache")
+@allure.title("Login again when the cached token is rejected")
+def test_token_cache_refreshes_rejected_token(valid_user_account: dict, tmp_path):
+    path = tmp_path / "tokens.json"
+    cache = TokenCache(str(path))
+    cache.store(valid_user_account["email"], "revoked-token", {})
+    user = UserAPI()
+    assert cache.login(user, valid_user_account) == 200
+    assert user.get_access_token() != "revoked-token"
+    assert TokenCache(str(path)).get_token(UserAPI(), valid_user_account) == user.get_access_token()
+
+
+@allure.feature("API helpers")
+@allure.story("Uploads")
+@allure.title("Map a file read-only, including an empty one")
+def test_mapped_file(tmp_path):
+    path = GetData().get_file_full_path("mainImage.jpg")
+    content = open(path, "rb").read()
+    with MappedFile(path) as file:
+        assert file.size == len(content)
+        assert bytes(file.view) == content
+        assert file.digest == hashlib.sha256(content).hexdigest()
+    empty = tmp_path / "empty.jpg"
+    empty.write_bytes(b"")
+    with MappedFile(str(empty)) as file:
+        assert file.size == 0 and bytes(file.view) == b""
+
+
+@allure.feature("API helpers")
+@allure.story("Uploads")
+@allure.title("Stream a multipart body whose length matches what is read")
+@pytest.mark.parametrize("chunk_size", [-1, 1, 4096])
+def test_multipart_stream(chunk_size):
+    test_data = GetData()
+    fields = {"title": "連衣裙", "sizes": ["S", "M"]}
+    paths = [test_data.get_file_full_path(name) for name in ("mainImage.jpg", "otherImage0.jpg")]
+    with MappedFile(paths[0]) as main_image, MappedFile(paths[1]) as other_image:
+        stream = MultipartStream(fields, [("main_image", main_image), ("other_images", other_image)])
+        chunks = []
+        while chunk := stream.read(chunk_size):
+            chunks.append(chunk)
+        body = b"".join(chunks)
+    assert len(body) == stream.len
+    parsed_fields, parsed_files = parse_multipart(stream.content_type, body)
+    assert parsed_fields == {"title": ["連衣裙"], "sizes": ["S", "M"]}
+    assert parsed_files == {
+        "main_image": [("mainImage.jpg", open(paths[0], "rb").read())],
+        "other_images": [("otherImage0.jpg", open(paths[1], "rb").read())],
+    }
+
+
+@allure.feature("API helpers")
+@allure.story("Latency report")
+@allure.title("Collapse path parameters and keep query keys only")
+def test_normalize_route():
+    host = "http://127.0.0.1:8000"
+    women = normalize_route("GET", f"{host}/api/1.0/products/women?paging=2")
+    assert women == "GET /products/{category}?paging="
+    assert normalize_route("GET", f"{host}/api/1.0/products/men?paging=0") == women
+    assert normalize_route("GET", f"{host}/api/1.0/products/men") == "GET /products/{category}"
+    with allure.step("details and search are routes of their own"):
+        assert normalize_route("GET", f"{host}/api/1.0/products/details?id=1") == "GET /products/details?id="
+        assert normalize_route("GET", f"{host}/api/1.0/products/details/") == "GET /products/details/"
+        assert normalize_route("GET", f"{host}/api/1.0/products/search?keyword=a") == "GET /products/search?keyword="
+    with allure.step("Order numbers and product ids are collapsed too"):
+        assert normalize_route("GET", f"{host}/api/1.0/order/123") == "GET /order/{order_number}"
+        assert normalize_route("DELETE", f"{host}/api/1.0/admin/product/9") == "DELETE /admin/product/{product_id}"
+
+
+@allure.feature("API helpers")
+@allure.story("Latency report")
+@allure.title("Take nearest-rank percentiles")
+@pytest.mark.parametrize(
+    "values, percent, expected",
+    [([5.0], 99, 5.0), (list(range(1, 11)), 0, 1), (list(range(1, 11)), 50, 5), (list(range(1, 11)), 95, 10)],
+)
+def test_percentile(values, percent, expected):
+    assert percentile(values, percent) == expected
+
+
+@allure.feature("API helpers")
+@allure.story("Latency report")
+@allure.title("Merge the samples of every worker into one report")
+def test_write_session_report(tmp_path):
+    route = "GET /products/{category}?paging="
+    (tmp_path / "samples-gw0.json").write_text(json.dumps([Sample(route, 200, 10.0, 100)]))
+    (tmp_path / "samples-gw1.json").write_text(
+        json.dumps([Sample(route, 200, 30.0, 300), Sample(route, 400, 20.0, 50)])
+    )
+    summary = write_session_report(str(tmp_path))
+    assert summary == {
+        route: {
+            "count": 3,
+            "p50_ms": 20.0,
+            "p95_ms": 30.0,
+            "p99_ms": 30.0,
+            "max_ms": 30.0,
+            "avg_size_bytes": 150,
+            "status": {"200": 2, "400": 1},
+        }
+    }
+    assert json.loads((tmp_path / "latency_report.json").read_text()) == summary
+
+
+@allure.feature("API helpers")
+@allure.story("Latency budget")
+@allure.title("Report the budget a sample is over, nothing once finished")
+def test_latency_budget_observe():
+    budget = LatencyBudget()
+    slow, fast = Sample("GET /products/{category}", 200, 30.0, 10), Sample("GET /products/{category}", 200, 5.0, 10)
+    assert budget.observe(slow) is None
+    budget.start(10)
+    assert budget.observe(slow) == 10
+    assert budget.observe(fast) is None
+    result = budget.finish()
+    assert result["calls"] == 2
+    assert result["violations"] == [{"route": slow.route, "status": 200, "elapsed_ms": 30.0}]
+    assert budget.observe(slow) is None
+
+
+@allure.feature("API helpers")
+@allure.story("Local server")
+@allure.title("List only products with an image and a colored variant")
+def test_local_server_lists_like_catalog(monkeypatch):
+    product = {"category": "women", "title": "洋裝", "price": 100, "main_image": "main.jpg"}
+    snapshot = {
+        "product": [{**product, "id": product_id} for product_id in (1, 2, 3)],
+        "product_images": [{"id": 1, "product_id": 1, "image": "0.jpg"}, {"id": 2, "product_id": 3, "image": "0.jpg"}],
+        "variant": [
+            {"id": 1, "product_id": 1, "color_id": 1, "size": "S", "stock": 1},
+            {"id": 2, "product_id": 1, "color_id": 9, "size": "M", "stock": 1},
+            {"id": 3, "product_id": 2, "color_id": 1, "size": "S", "stock": 1},
+            {"id": 4, "product_id": 3, "color_id": 9, "size": "S", "stock": 1},
+        ],
+        "color": [{"id": 1, "code": "FFFFFF", "name": "白色"}],
+    }
+    with StylishLocalServer(snapshot) as server:
+        monkeypatch.setattr(RequestUtil, "host", server.url)
+        product_api = ProductsAPI()
+        for response in (product_api.get_products_by_category("all"), product_api.get_products_by_keyword("洋裝")):
+            data = response.json()["data"]
+            assert [product["id"] for product in data] == [1]
+            assert data[0]["variants"] == [{"color_code": "FFFFFF", "size": "S", "stock": 1}]
@@ -0,0 +1,119 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import allure
+import pandas as pd
+import pytest
+from sqlalchemy import text
+
+from database.catalog import DETAIL_COLUMNS, load_catalog, save_catalog
+from database.local_schema import create_local_database
+from database.stylish_backend import StylishBackend
+
+PRODUCT = {
+    "category": "women",
+    "title": "洋裝",
+    "description": "d",
+    "price": 100,
+    "texture": "t",
+    "wash": "w",
+    "place": "p",
+    "note": None,
+    "story": "s",
+    "main_image": "main.jpg",
+}
+# Product 3 has no image and is not listed, product 2 has a variant of an unknown color.
+SNAPSHOT = {
+    "product": [{**PRODUCT, "id": 1}, {**PRODUCT, "id": 2, "title": "襯衫", "note": "n"}, {**PRODUCT, "id": 3}],
+    "product_images": [
+        {"id": 1, "product_id": 1, "image": "0.jpg"},
+        {"id": 2, "product_id": 1, "image": "1.jpg"},
+        {"id": 3, "product_id": 2, "image": "0.jpg"},
+    ],
+    "variant": [
+        {"id": 1, "product_id": 1, "color_id": 1, "size": "S", "stock": 1},
+        {"id": 2, "product_id": 1, "color_id": 2, "size": "M", "stock": 2},
+        {"id": 3, "product_id": 2, "color_id": 9, "size": "S", "stock": 3},
+        {"id": 4, "product_id": 2, "color_id": 1, "size": "L", "stock": 4},
+        {"id": 5, "product_id": 3, "color_id": 1, "size": "S", "stock": 5},
+    ],
+    "color": [{"id": 1, "code": "FFFFFF", "name": "白色"}, {"id": 2, "code": "000000", "name": "黑色"}],
+}
+
+
+@pytest.fixture
+def sqlite_backend(tmp_path, monkeypatch):
+    url = create_local_database(tmp_path / "stylish.db", SNAPSHOT)
+    StylishBackend.dispose_shared_engine()
+    monkeypatch.setattr(StylishBackend, "url", url)
+    yield StylishBackend()
+    StylishBackend.dispose_shared_engine()
+
+
+@allure.feature("Database helpers")
+@allure.story("Catalog snapshot")
+@allure.title("Load the same catalog that was saved, like the inner join of the detail query")
+def test_catalog_round_trip(sqlite_backend: StylishBackend, tmp_path):
+    catalog = sqlite_backend.get_catalog()
+    save_catalog(catalog, str(tmp_path / "catalog"))
+    loaded = load_catalog(str(tmp_path / "catalog"))
+    assert loaded.fingerprint == catalog.fingerprint
+    assert loaded.ids == catalog.ids == [1, 2]
+    pd.testing.assert_frame_equal(loaded.product_detail(), catalog.product_detail())
+    with allure.step("The rows are the ones of get_all_product_detail"):
+        expected = sqlite_backend.get_all_product_detail()[DETAIL_COLUMNS]
+        detail = loaded.product_detail().astype(object)
+        assert sorted(detail.where(detail.notna(), None).to_dict("records"), key=str) == sorted(
+            expected.astype(object).where(expected.notna(), None).to_dict("records"), key=str
+        )
+    assert loaded.products["note"].isna().tolist() == [True, False]
+    assert loaded.color_code_dict() == {"白色": "FFFFFF", "黑色": "000000"}
+
+
+@allure.feature("Database helpers")
+@allure.story("Catalog snapshot")
+@allure.title("Reject a missing, stale or old-format snapshot")
+def test_load_catalog_rejects_unusable_snapshot(sqlite_backend: StylishBackend, tmp_path):
+    cache_dir = tmp_path / "catalog"
+    assert load_catalog(str(cache_dir)) is None
+    catalog = sqlite_backend.get_catalog()
+    save_catalog(catalog, str(cache_dir))
+    assert load_catalog(str(cache_dir), catalog.fingerprint) is not None
+    assert load_catalog(str(cache_dir), {**catalog.fingerprint, "stock_sum": -1}) is None
+    manifest_path = Path(cache_dir) / "manifest.json"
+    manifest = json.loads(manifest_path.read_text())
+    manifest_path.write_text(json.dumps({key: value for key, value in manifest.items() if key != "format"}))
+    assert load_catalog(str(cache_dir)) is None
+
+
+@allure.feature("Database helpers")
+@allure.story("Catalog snapshot")
+@allure.title("Refresh the snapshot once, and again only after the tables change")
+def test_get_cached_catalog_refreshes_once(sqlite_backend: StylishBackend, tmp_path, monkeypatch):
+    cache_dir = str(tmp_path / "catalog")
+    fetches = []
+    lock = threading.Lock()
+    get_catalog = StylishBackend.get_catalog
+
+    def counting_get_catalog(self):
+        with lock:
+            fetches.append(threading.get_ident())
+        return get_catalog(self)
+
+    monkeypatch.setattr(StylishBackend, "get_catalog", counting_get_catalog)
+    with allure.step("Concurrent callers wait for the one refreshing under the lock"):
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            catalogs = list(executor.map(lambda _: StylishBackend().get_cached_catalog(cache_dir), range(4)))
+        assert len(fetches) == 1
+        assert {json.dumps(catalog.fingerprint) for catalog in catalogs} == {json.dumps(catalogs[0].fingerprint)}
+    with allure.step("An unchanged database reuses the snapshot"):
+        sqlite_backend.get_cached_catalog(cache_dir)
+        assert len(fetches) == 1
+    with allure.step("An in-place update makes it stale"):
+        with sqlite_backend.engine.begin() as connection:
+            connection.execute(text("UPDATE variant SET stock = stock + 1 WHERE id = 1;"))
+        catalog = sqlite_backend.get_cached_catalog(cache_dir)
+        assert len(fetches) == 2
+        assert catalog.variants.set_index("variant_id")["stock"][1] == 2
@@ -0,0 +1,135 @@
+import allure
+import pandas as pd
+import pytest
+
+from test_data.get_data_from_excel import PLACEHOLDER_RULES, WORKBOOK, Chars, GetData, expand_placeholders
+
+SAMPLE_IMAGES = {
+    "Main Image": {"sample image": "mainImage.jpg"},
+    "Other Image 1": {"sample image": "otherImage0.jpg"},
+    "Other Image 2": {"sample image": "otherImage1.jpg"},
+}
+# The literal replacements GetData made before the placeholder rules, column "*" is replaced in every column.
+BASELINE = {
+    "get_invalid_checkout_data": (
+        "Checkout with Invalid Value",
+        {
+            "Receiver": {"101 chars": "陳" * 101},
+            "Email": {"51 chars": "abc@" + "a" * 43 + ".com"},
+            "Address": {"256 chars": "台" * 256},
+        },
+    ),
+    "get_valid_checkout_data": ("Checkout with Valid Value", {}),
+    "get_invalid_product_create_info": (
+        "Create Product Failed",
+        {
+            "Title": {"256 chars": "裙" * 256},
+            "Description": {"256 chars": "詳細內容" * 64},
+            "Texture": {"128 chars": "棉" * 128},
+            "Wash": {"128 chars": "手洗" * 64},
+            "Place of Product": {"128 chars": "TW" * 64},
+            "Note": {"128 chars": "Note" * 32},
+            **SAMPLE_IMAGES,
+        },
+    ),
+    "get_valid_product_create_info": (
+        "Create Product Success",
+        {
+            "Title": {"連身裙": "Mingchun_連身裙", "1 chars": "I", "255 chars": "Mingchun_" + "裙" * 246},
+            "Description": {"1 chars": "I", "255 chars": "連" * 255},
+            "Texture": {"1 chars": "I", "127 chars": "棉" * 127},
+            "Wash": {"1 chars": "I", "127 chars": "洗" * 127},
+            "Place of Product": {"1 chars": "I", "127 chars": "台" * 127},
+            "Note": {"1 chars": "I", "127 chars": "筆" * 127},
+            "Story": {"1 chars": "I"},
+            **SAMPLE_IMAGES,
+        },
+    ),
+    "get_valid_api_product_create_info": (
+        "API Create Product Success",
+        {
+            "Title": {"連身裙": "Mingchun_連身裙"},
+            **SAMPLE_IMAGES,
+            "*": {"1 chars": "I", "255 chars": "Mingchun_" + "褲" * 246, "127 chars": "Mingchun_" + "裙" * 118},
+        },
+    ),
+    "get_invalid_api_product_create_info": (
+        "API Create Product Failed",
+        {**SAMPLE_IMAGES, "*": {"256 chars": "Mingchun_" + "褲" * 247, "128 chars": "Mingchun_" + "裙" * 119}},
+    ),
+}
+
+
+def baseline_records(sheet: str, replacements: dict):
+    df = pd.read_excel(WORKBOOK, sheet, dtype=str).fillna("")
+    for column, mapping in replacements.items():
+        for placeholder, value in mapping.items():
+            if column == "*":
+                df = df.replace(placeholder, value)
+            else:
+                df[column] = df[column].replace(placeholder, value)
+    return df.to_dict("records")
+
+
+@allure.feature("Test data")
+@allure.story("Placeholders")
+@allure.title("Fill exactly the requested number of chars")
+@pytest.mark.parametrize(
+    "chars, length, expected",
+    [
+        (Chars("陳"), 101, "陳" * 101),
+        (Chars("詳細內容"), 256, "詳細內容" * 64),
+        (Chars("a", prefix="abc@", suffix=".com"), 51, "abc@" + "a" * 43 + ".com"),
+        (Chars("褲", prefix="Mingchun_"), 255, "Mingchun_" + "褲" * 246),
+        (Chars("a", prefix="abc@", suffix=".com"), 8, "abc@.com"),
+    ],
+)
+def test_chars_fill(chars: Chars, length: int, expected: str):
+    assert chars.fill(length) == expected
+    assert len(chars.fill(length)) == length
+    assert chars.expand(f"{length} chars") == expected
+
+
+@allure.feature("Test data")
+@allure.story("Placeholders")
+@allure.title("Reject a length the unit, prefix and suffix cannot fill")
+@pytest.mark.parametrize(
+    "chars, length",
+    [
+        (Chars("手洗"), 127),
+        (Chars("Note"), 130),
+        (Chars("a", prefix="abc@", suffix=".com"), 7),
+        (Chars("褲", prefix="Mingchun_"), 0),
+    ],
+)
+def test_chars_fill_rejects_unfillable_length(chars: Chars, length: int):
+    with pytest.raises(ValueError):
+        chars.fill(length)
+
+
+@allure.feature("Test data")
+@allure.story("Placeholders")
+@allure.title("Expand every placeholder of the rules to its length and leave other cells alone")
+def test_expand_placeholders():
+    with allure.step("Every Chars rule fills its placeholder"):
+        for sheet, columns in PLACEHOLDER_RULES.items():
+            for column, mapping in columns.items():
+                for placeholder, value in mapping.items():
+                    if isinstance(value, Chars):
+                        assert len(value.expand(placeholder)) == int(placeholder.split()[0]), (sheet, column)
+    df = pd.DataFrame({"Receiver": ["101 chars", "陳"], "Email": ["51 chars", "101 chars"], "Phone": ["51 chars", ""]})
+    expanded = expand_placeholders("Checkout with Invalid Value", df)
+    assert [len(value) for value in expanded["Receiver"]] == [101, 1]
+    assert [len(value) for value in expanded["Email"]] == [51, len("101 chars")]
+    assert expanded["Phone"].tolist() == ["51 chars", ""]
+    assert df["Receiver"].tolist() == ["101 chars", "陳"]
+
+
+@allure.feature("Test data")
+@allure.story("GetData")
+@allure.title("Return the same records as the literal replacements of the baseline")
+@pytest.mark.parametrize("method", BASELINE)
+def test_get_data_matches_baseline(method: str):
+    sheet, replacements = BASELINE[method]
+    records = getattr(GetData(), method)()
+    assert [dict(record) for record in records] == baseline_records(sheet, replacements)
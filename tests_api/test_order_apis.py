@@ -1,12 +1,17 @@
+import asyncio
 import json
 from random import choices, randint
 
 import allure
 import pytest
 
-from api_objects.order import OrderAPI
-from database.stylish_backend import StylishBackend
+from api_objects.order import AsyncOrderAPI, OrderAPI
+from api_objects.token_cache import TokenCache
+from database.stylish_backend import AsyncStylishBackend, StylishBackend
 from page_objects.prime_page import PrimePage
+from test_data.boundary_values import ORDER_FIELDS, Field, with_value
+
+pytestmark = pytest.mark.latency_budget(ms=1000)
 
 
 @pytest.fixture
@@ -55,12 +60,9 @@ def order_info(prime: str, shopping_cart: list):
 
 
 @pytest.fixture
-def order(valid_user_account: dict):
+def order(valid_user_account: dict, token_cache: TokenCache):
     _order = OrderAPI()
-    login_info = valid_user_account.copy()
-    login_info.update({"provider": "native"})
-    _order.set_login_request_body(login_info)
-    assert _order.login() == 200
+    assert token_cache.login(_order, valid_user_account) == 200
     return _order
 
 
@@ -90,12 +92,45 @@ def test_order_with_valid_info(order: OrderAPI, order_info: dict):
         response = order.make_an_order(order_info)
         assert response.status_code == 200
 
+    async def read_back(order_number: str):
+        # Same user as the order fixture. The database is polled on its own pool while the order is read back
+        # through the API, whose calls are logged on the event loop thread inside the step.
+        async_order = AsyncOrderAPI()
+        async_order.headers.update(order.headers)
+        order_detail = asyncio.create_task(AsyncStylishBackend().get_order_detail_by_number(order_number))
+        response = await async_order.get_order_detail_by_number(order_number)
+        return response, await order_detail
+
     with allure.step("Assert if order detail in database is the same with payload"):
         order_number = response.json()["data"]["number"]
-        order_detail = StylishBackend().get_order_detail_by_number(order_number)
+        response, order_detail = asyncio.run(read_back(order_number))
+        assert response.status_code == 200
         assert json.loads(order_detail["details"]) == order_info["order"]
 
 
+@allure.feature("Order APIs")
+@allure.story("/order")
+@allure.title("[Boundary] Length of recipient fields")
+@pytest.mark.parametrize(
+    "field, label, value, valid",
+    [
+        pytest.param(field, *variant, id=f"{field.name}={variant[0]}")
+        for field in ORDER_FIELDS
+        for variant in field.variants()
+    ],
+)
+def test_order_with_boundary_values(
+    order: OrderAPI, order_info: dict, field: Field, label: str, value: str, valid: bool | None
+):
+    with allure.step(f"Make an order with {field.name}={label}"):
+        response = order.make_an_order(with_value(order_info, field.path, value))
+
+    # Storing 4-byte characters depends on the column charset, so a value of unknown validity may go either way.
+    expected = {True: (200,), False: (400,), None: (200, 400)}[valid]
+    with allure.step(f"Assert if the status code is one of {expected}"):
+        assert response.status_code in expected
+
+
 @allure.feature("Order APIs")
 @allure.story("/order")
 @allure.title("[Irregular] No prime")
@@ -1,83 +1,52 @@
+import asyncio
+import json
 import math
 
 import allure
 import pytest
 
-from api_objects.products import ProductsAPI
-
-
-def shape_db_product_data(db_products, id_list):
-    products = []
-    for id in id_list:
-        df = db_products.query("id==@id")
-        detail = (
-            df[
-                [
-                    "id",
-                    "category",
-                    "title",
-                    "description",
-                    "price",
-                    "texture",
-                    "wash",
-                    "place",
-                    "note",
-                    "story",
-                    "main_image",
-                ]
-            ]
-            .drop_duplicates(subset="id")
-            .to_dict("records")[0]
-        )
-        detail["images"] = df[["image_id", "image"]].drop_duplicates(subset="image_id")["image"].tolist()
-        detail["variants"] = (
-            df[["variant_id", "color_code", "size", "stock"]]
-            .drop_duplicates(subset="variant_id")
-            .set_index("variant_id")
-            .to_dict("records")
-        )
-        detail["colors"] = (
-            df[["color_code", "color_name"]]
-            .drop_duplicates(subset="color_code")
-            .rename(columns={"color_code": "code", "color_name": "name"})
-            .to_dict("records")
-        )
-        detail["sizes"] = df["size"].drop_duplicates().tolist()
-        products.append(detail)
-    return products
+from api_objects.products import AsyncProductsAPI, ProductsAPI
 
+pytestmark = pytest.mark.latency_budget(ms=500)
 
-@pytest.fixture
-def category_result(db_products, request):
-    if request.param == "all":
-        id_list = db_products["id"].drop_duplicates().tolist()
-    else:
-        id_list = (
-            db_products[["id", "category"]]
-            .drop_duplicates(subset="id")
-            .query("category==@request.param")["id"]
-            .tolist()
-        )
+
+@pytest.fixture(autouse=True)
+def products_cache(response_cache):
+    # These tests only verify data shape, identical product lookups don't need to hit the server again.
+    ProductsAPI.cache = response_cache
+    yield
+    ProductsAPI.cache = None
+
+
+def filter_db_category(catalog, product_index, category):
+    products = catalog.product_names()
+    if category != "all":
+        products = products.query("category==@category")
+    id_list = products.index.tolist()
     last_page = math.ceil(len(id_list) / 6) - 1
     if last_page < 0:
         last_page = 0
-    return request.param, shape_db_product_data(db_products, id_list), last_page
+    return [product_index[id] for id in id_list], last_page
+
+
+@pytest.fixture
+def category_result(catalog, product_index, request):
+    return request.param, *filter_db_category(catalog, product_index, request.param)
 
 
 @pytest.fixture
-def keyword_result(db_products, request):
-    db_unique = db_products[["id", "title"]].drop_duplicates(subset="id")
-    id_list = db_unique[db_unique["title"].str.contains(request.param)]["id"].tolist()
+def keyword_result(catalog, product_index, request):
+    titles = catalog.product_names()["title"]
+    id_list = titles[titles.str.contains(request.param)].index.tolist()
     last_page = math.ceil(len(id_list) / 6) - 1
     if last_page < 0:
         last_page = 0
-    return request.param, shape_db_product_data(db_products, id_list), last_page
+    return request.param, [product_index[id] for id in id_list], last_page
 
 
 @pytest.fixture
-def detail_result(db_products, request):
-    id_list = [request.param]
-    return request.param, shape_db_product_data(db_products, id_list)
+def detail_result(product_index, request):
+    return request.param, [product_index[request.param]]
 
 
 @allure.feature("Products APIs")
@@ -102,6 +71,50 @@ def test_category_with_valid_input(category_result):
         assert res.json()["data"] == db_filter_result[last_page_index:]
 
 
+@allure.feature("Products APIs")
+@allure.story("/products/{category}?paging={paging}")
+@allure.title("Walk every page of a category")
+@pytest.mark.parametrize("category_result", ["all", "women", "men", "accessories"], indirect=True)
+def test_category_all_pages(category_result):
+    category, db_filter_result, _ = category_result
+    paginator = ProductsAPI().paginate_products_by_category(category)
+
+    with allure.step("Get category products of every page"):
+        products = list(paginator)
+        allure.attach(
+            json.dumps(paginator.page_timings),
+            "Page timings (page, ms, products)",
+            attachment_type=allure.attachment_type.JSON,
+        )
+    with allure.step("Assert if products of all pages are the same with database"):
+        assert products == db_filter_result
+
+
+@allure.feature("Products APIs")
+@allure.story("/products/{category}?paging={paging}")
+@allure.title("Get first and last page of every category concurrently")
+def test_category_pages_concurrently(catalog, product_index):
+    categories = ["all", "women", "men", "accessories"]
+    expected = {category: filter_db_category(catalog, product_index, category) for category in categories}
+
+    async def sweep():
+        product = AsyncProductsAPI()
+        calls = [product.get_products_by_category(category, 0) for category in categories]
+        calls += [product.get_products_by_category(category, expected[category][1]) for category in categories]
+        return await asyncio.gather(*calls)
+
+    with allure.step("Get first and last page of every category in one event loop"):
+        responses = asyncio.run(sweep())
+        assert [res.status_code for res in responses] == [200] * len(responses)
+
+    with allure.step("Assert if every page is the same with database"):
+        first_pages, last_pages = responses[: len(categories)], responses[len(categories) :]
+        for category, first_page, last_page in zip(categories, first_pages, last_pages):
+            db_filter_result, last_page_number = expected[category]
+            assert first_page.json()["data"] == db_filter_result[0:6]
+            assert last_page.json()["data"] == db_filter_result[last_page_number * 6 :]
+
+
 @allure.feature("Products APIs")
 @allure.story("/products/{category}?paging={paging}")
 @allure.title("Search products without the page parameter")
@@ -0,0 +1,138 @@
+import asyncio
+import time
+
+import allure
+import pytest
+from sqlalchemy.exc import NoResultFound
+
+from database.seeder import COLOR_IDS, StylishSeeder
+from database.stylish_backend import (
+    ACCESS_TOKEN_BY_EMAIL,
+    ORDER_DETAILS_BY_NUMBERS,
+    PRODUCT_DETAIL_BY_ID,
+    USER_DATA_BY_EMAIL,
+    AsyncStylishBackend,
+    StylishBackend,
+    wait_until,
+)
+
+
+@allure.feature("Database helpers")
+@allure.story("StylishBackend.fetch_*")
+@allure.title("Fetch a scalar, a row, rows and a frame with bound statements")
+def test_fetch_helpers(database: StylishBackend, valid_user_account: dict, catalog):
+    email = valid_user_account["email"]
+    with allure.step("fetch_scalar and fetch_one return the matching user"):
+        assert isinstance(database.fetch_scalar(ACCESS_TOKEN_BY_EMAIL, email=email), str)
+        user = database.fetch_one(USER_DATA_BY_EMAIL, email=email)
+        assert user["email"] == email
+        assert set(user) == {"id", "provider", "email", "name", "picture"}
+    with allure.step("fetch_all returns an empty list when nothing matches"):
+        assert database.fetch_all(ORDER_DETAILS_BY_NUMBERS, numbers=["no-such-order"]) == []
+    with allure.step("fetch_frame returns one row per image and variant of the product"):
+        product_id = int(catalog.ids[0])
+        df = database.fetch_frame(PRODUCT_DETAIL_BY_ID, product_id=product_id)
+        assert not df.empty
+        assert (df["id"] == product_id).all()
+
+
+@allure.feature("Database helpers")
+@allure.story("StylishBackend.fetch_*")
+@allure.title("Raise NoResultFound when no row matches")
+def test_fetch_helpers_raise_without_row(database: StylishBackend):
+    with pytest.raises(NoResultFound):
+        database.fetch_scalar(ACCESS_TOKEN_BY_EMAIL, email="nobody@example.com")
+    with pytest.raises(NoResultFound):
+        database.fetch_one(USER_DATA_BY_EMAIL, email="nobody@example.com")
+
+
+@allure.feature("Database helpers")
+@allure.story("AsyncStylishBackend")
+@allure.title("Run lookups of the wrapped backend concurrently on the DB pool")
+def test_async_backend_wraps_sync_lookups(database: StylishBackend, valid_user_account: dict, catalog):
+    email = valid_user_account["email"]
+    product_id = int(catalog.ids[0])
+
+    async def lookups():
+        db = AsyncStylishBackend(database)
+        return await asyncio.gather(
+            db.get_access_token_by_email(email),
+            db.get_user_data_by_email(email),
+            db.get_product_detail_by_id(product_id),
+            db.get_order_details_by_numbers([]),
+        )
+
+    token, user, product_detail, orders = asyncio.run(lookups())
+    assert token == database.get_access_token_by_email(email)
+    assert user == database.get_user_data_by_email(email)
+    assert product_detail.equals(database.get_product_detail_by_id(product_id))
+    assert orders == {}
+    with allure.step("The wrapped backend keeps its sync API"):
+        assert database.get_catalog_fingerprint() == catalog.fingerprint
+
+
+@allure.feature("Database helpers")
+@allure.story("wait_until")
+@allure.title("Retry a probe until it finds its rows")
+def test_wait_until_returns_after_misses():
+    calls = []
+
+    def probe():
+        calls.append(time.monotonic())
+        if len(calls) < 3:
+            raise NoResultFound("not yet")
+        return "found"
+
+    assert wait_until(probe, timeout=5, first_delay=0.01) == "found"
+    assert len(calls) == 3
+    with allure.step("The delay doubles after every miss"):
+        assert calls[1] - calls[0] >= 0.01
+        assert calls[2] - calls[1] >= 0.02
+
+
+@allure.feature("Database helpers")
+@allure.story("wait_until")
+@allure.title("Raise the last NoResultFound once the timeout is over")
+def test_wait_until_times_out():
+    calls = []
+
+    def probe():
+        calls.append(time.monotonic())
+        raise NoResultFound(f"miss {len(calls)}")
+
+    start = time.monotonic()
+    with pytest.raises(NoResultFound, match=r"miss \d+"):
+        wait_until(probe, timeout=0.3, first_delay=0.01, max_delay=0.05)
+    assert time.monotonic() - start >= 0.3
+    assert len(calls) > 1
+
+
+@allure.feature("Database helpers")
+@allure.story("StylishBackend.get_order_details_by_numbers")
+@allure.title("Return no orders for no numbers and give up on a missing one")
+def test_order_details_by_numbers(database: StylishBackend):
+    with allure.step("An empty list returns at once"):
+        assert database.get_order_details_by_numbers([]) == {}
+    with allure.step("A missing order raises after the timeout"):
+        with pytest.raises(NoResultFound, match="1 of 1 orders not found"):
+            database.get_order_details_by_numbers(["no-such-order"], timeout=0.1)
+
+
+@allure.feature("Database helpers")
+@allure.story("StylishSeeder")
+@allure.title("Seed products with each color at most once and purge them")
+def test_seeder(seeder: StylishSeeder, database: StylishBackend):
+    color_count = len(database.fetch_all(COLOR_IDS))
+    with allure.step("Ask for more colors than the color table has"):
+        product_ids = seeder.seed_products(2, images_per_product=1, sizes=("S",), color_count=color_count + 2)
+        for product_id in product_ids:
+            df = database.get_product_detail_by_id(product_id)
+            assert sorted(df["color_id"]) == sorted(set(df["color_id"]))
+            assert len(df) == color_count
+    with allure.step("Ids are this worker's and a second batch does not reuse them"):
+        product_ids += seeder.seed_products(2, images_per_product=1, sizes=("S",), color_count=1)
+        assert len(set(product_ids)) == 4
+        assert all(product_id % seeder.workers == seeder.worker for product_id in product_ids)
+    with allure.step("Purge deletes every seeded product"):
+        assert seeder.purge() == 4
+        assert all(database.get_product_detail_by_id(product_id).empty for product_id in product_ids)
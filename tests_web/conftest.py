@@ -10,8 +10,9 @@ from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
 from webdriver_manager.core.utils import ChromeType
 
-from database.stylish_backend import StylishBackend
+from api_objects.user import UserAPI
 from page_objects.home_page import HomePage
+from page_objects.login_page import LoginPage
 
 BRAVE_PATH = "/Applications/Brave Browser.app/Contents/MacOS/Brave Browser"
 
@@ -63,24 +64,18 @@ def home(driver):
 
 
 @pytest.fixture(scope="session")
-def database():
-    return StylishBackend()
+def product_detail(catalog):
+    return catalog.product_detail()
 
 
 @pytest.fixture(scope="session")
-def product_detail(database):
-    return database.get_all_product_detail()
+def product_names(catalog):
+    return catalog.product_names()
 
 
 @pytest.fixture(scope="session")
-def product_names(product_detail):
-    return product_detail[["id", "category", "title"]].drop_duplicates(subset="id").set_index("id")
-
-
-@pytest.fixture(scope="session")
-def all_color_code(product_detail):
-    _color_code = product_detail[["color_name", "color_code"]].drop_duplicates(subset="color_name")
-    return _color_code.set_index("color_name").to_dict()["color_code"]
+def all_color_code(catalog):
+    return catalog.color_code_dict()
 
 
 @pytest.fixture(scope="session")
@@ -94,3 +89,12 @@ def user(worker_id):
             return user_data["user1"]
         case "gw2":
             return user_data["user2"]
+
+
+@pytest.fixture
+def logged_in(driver, user, token_cache):
+    # Put a cached access token in local storage instead of filling in the login form.
+    login = LoginPage(driver, "http://54.201.140.239/index.html")
+    login.set_jwt_token(token_cache.get_token(UserAPI(), user))
+    driver.refresh()
+    return login
@@ -6,7 +6,6 @@ import allure
 import pytest
 
 from page_objects.cart_page import CartPage
-from page_objects.login_page import LoginPage
 from page_objects.product_page import ProductPage
 from test_data.get_data_from_excel import GetData
 
@@ -37,19 +36,12 @@ valid_checkout_values = test_data.get_valid_checkout_data()
 @allure.story("Checkout")
 @allure.title("Checkout with empty cart")
 @allure.testcase(TESTCASE_BASE_LINK + TESTCASE_CATEGORY + "checkout-with-empty-cart", "Shopping Cart Info Correct")
-def test_checkout_with_empty_cart(driver, user):
+def test_checkout_with_empty_cart(driver, logged_in):
     """
     檢查空購物車進行結帳時，會顯示預期的警告訊息。
     """
-    with allure.step("Login success"):
-        login = LoginPage(driver, "http://54.201.140.239/login.html")
-        login.enter_email_and_password(user["email"], user["password"])
-        login.login()
-        alert = login.wait_alert_prompt()
-        alert.accept()
-
     with allure.step("Enter shopping cart and checkout without products"):
-        login.enter_shopping_cart()
+        logged_in.enter_shopping_cart()
         cart = CartPage(driver)
         cart.checkout()
 
@@ -68,17 +60,10 @@ def test_checkout_with_empty_cart(driver, user):
     "Checkout with invalid values",
 )
 @pytest.mark.parametrize("checkout_info", invalid_checkout_values)
-def test_checkout_with_invalid_values(driver, random_product_ids, all_color_code, user, checkout_info):
+def test_checkout_with_invalid_values(driver, random_product_ids, all_color_code, logged_in, checkout_info):
     """
     檢查輸入各種無效的訂單資訊時，會顯示預期的警告訊息。
     """
-    with allure.step("Login success"):
-        login = LoginPage(driver, "http://54.201.140.239/login.html")
-        login.enter_email_and_password(user["email"], user["password"])
-        login.login()
-        alert = login.wait_alert_prompt()
-        alert.accept()
-
     with allure.step("Add products to shopping cart"):
         product = ProductPage(driver)
         shop_list = []
@@ -145,17 +130,10 @@ def test_checkout_with_invalid_values(driver, random_product_ids, all_color_code
     "Checkout with valid values",
 )
 @pytest.mark.parametrize("checkout_info", valid_checkout_values)
-def test_checkout_with_valid_values(driver, random_product_ids, all_color_code, user, checkout_info):
+def test_checkout_with_valid_values(driver, random_product_ids, all_color_code, logged_in, checkout_info):
     """
     檢查輸入有效的訂單資訊時，可成功結帳且結帳商品的資訊正確。
     """
-    with allure.step("Login success"):
-        login = LoginPage(driver, "http://54.201.140.239/login.html")
-        login.enter_email_and_password(user["email"], user["password"])
-        login.login()
-        alert = login.wait_alert_prompt()
-        alert.accept()
-
     with allure.step("Add products to shopping cart"):
         product = ProductPage(driver)
         shop_list = []
@@ -18,12 +18,7 @@ valid_product_create_info = test_data.get_valid_product_create_info()
 
 
 @pytest.fixture
-def admin_init(driver, user, request):
-    login = LoginPage(driver, "http://54.201.140.239/login.html")
-    login.enter_email_and_password(user["email"], user["password"])
-    login.login()
-    alert = login.wait_alert_prompt()
-    alert.accept()
+def admin_init(driver, logged_in, request):
     _admin = AdminPage(driver, "http://54.201.140.239/admin/products.html")
     yield _admin, request.param
     _admin.switch_back_to_main_window()